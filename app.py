@@ -1,10 +1,14 @@
 import streamlit as st
 import pandas as pd
-from sqlalchemy import create_engine, Column, Integer, String, Float, Date
+import numpy as np
+from sqlalchemy import create_engine, Column, Integer, String, Float, Date, text, select, insert, delete, func, Index, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime, timedelta
 import sqlite3
+import threading
+from functools import lru_cache
+from dataclasses import dataclass
 
 # Database setup
 Base = declarative_base()
@@ -17,6 +21,7 @@ class User(Base):
 
 class UserProfile(Base):
     __tablename__ = 'profiles'
+    __table_args__ = (Index('ix_profiles_username', 'username'),)
     id = Column(Integer, primary_key=True)
     username = Column(String, nullable=False)
     weight = Column(Float, nullable=False)
@@ -28,6 +33,7 @@ class UserProfile(Base):
 
 class FoodLog(Base):
     __tablename__ = 'food_logs'
+    __table_args__ = (Index('ix_food_logs_user_date_cat', 'username', 'log_date', 'meal_category'),)
     id = Column(Integer, primary_key=True)
     username = Column(String, nullable=False)
     log_date = Column(Date, nullable=False)
@@ -38,13 +44,14 @@ class FoodLog(Base):
     carbs = Column(Float, nullable=False)
     fiber = Column(Float, default=0.0)
     sodium = Column(Float, default=0.0)
-    meal_category = Column(String, default='Snacks')
+    meal_category = Column(String, nullable=False, default='Snacks', server_default='Snacks')
 
 class WeightLog(Base):
     __tablename__ = 'weight_logs'
+    __table_args__ = (UniqueConstraint('username', 'log_date', name='uq_weight_logs_user_date'),)
     id = Column(Integer, primary_key=True)
     username = Column(String, nullable=False)
-    log_date = Column(Date, nullable=False, unique=False)
+    log_date = Column(Date, nullable=False)
     weight = Column(Float, nullable=False)
     notes = Column(String, default="")
 
@@ -63,83 +70,279 @@ def get_database_url():
 
 # Create database engine for user data
 DATABASE_URL = get_database_url()
-engine = create_engine(DATABASE_URL)
-Base.metadata.create_all(engine)
+
+@st.cache_resource
+def get_engine():
+    """Engine plus one-time schema setup, created once per process.
+
+    Streamlit re-executes the script on every rerun; without the resource
+    cache the engine, create_all and index backfills would all repeat.
+    """
+    engine = create_engine(DATABASE_URL)
+    Base.metadata.create_all(engine)
+    # Backfill indexes on databases created before they were declared on the
+    # models; the unique one also serves as the weight-log UPSERT conflict target
+    with engine.begin() as _conn:
+        _conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_weight_logs_user_date ON weight_logs (username, log_date)"
+        ))
+        _conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_profiles_username ON profiles (username)"
+        ))
+        _conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_food_logs_user_date_cat ON food_logs (username, log_date, meal_category)"
+        ))
+        # Rows written before meal_category existed may be NULL; normalize them
+        # so the column can be read directly without a getattr fallback
+        _conn.execute(text(
+            "UPDATE food_logs SET meal_category = 'Snacks' WHERE meal_category IS NULL"
+        ))
+    return engine
+
+engine = get_engine()
 Session = sessionmaker(bind=engine)
 
+@st.cache_resource
+def get_read_conn():
+    """Shared autocommit connection for read-only lookups.
+
+    Avoids paying Session construction, identity-map, and transaction
+    bookkeeping on every rerun; writes still go through Session/engine.
+    """
+    return engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+
+def get_profile(username):
+    """Fetch a user's profile row (or None) without ORM overhead"""
+    return get_read_conn().execute(
+        select(UserProfile.__table__)
+        .where(UserProfile.username == username)
+        .limit(1)
+    ).first()
+
+def get_weight_log_for_date(username, log_date):
+    """Fetch the weight log row for one date (or None) without ORM overhead"""
+    return get_read_conn().execute(
+        select(WeightLog.__table__)
+        .where(WeightLog.username == username, WeightLog.log_date == log_date)
+        .limit(1)
+    ).first()
+
+@st.cache_data(ttl=30)
+def load_food_log_context(username, current_date):
+    """Profile, the date's weight log, and latest weight in one round-trip.
+
+    Returns a single row carrying all profile columns plus logged_weight /
+    logged_notes for the viewed date and latest_weight on or before it, or
+    None if the user has no profile. Cleared on profile and weight saves.
+    """
+    weight_logs = WeightLog.__table__.alias('w')
+    profiles = UserProfile.__table__
+
+    latest_weight_sq = (
+        select(WeightLog.weight)
+        .where(WeightLog.username == username, WeightLog.log_date <= current_date)
+        .order_by(WeightLog.log_date.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+    stmt = (
+        select(
+            profiles,
+            weight_logs.c.weight.label('logged_weight'),
+            weight_logs.c.notes.label('logged_notes'),
+            latest_weight_sq.label('latest_weight')
+        )
+        .select_from(profiles.outerjoin(
+            weight_logs,
+            (weight_logs.c.username == profiles.c.username)
+            & (weight_logs.c.log_date == current_date)
+        ))
+        .where(profiles.c.username == username)
+        .limit(1)
+    )
+    return get_read_conn().execute(stmt).first()
+
+# SQL statements for the food database, kept as module-level constants so
+# sqlite3's per-connection statement cache can reuse the prepared handles
+# (the cache is keyed on the SQL text object)
+SQL_SEARCH_FTS = """
+    SELECT f.fdc_id, f.description, f.data_type
+    FROM food_fts
+    JOIN food f ON f.fdc_id = food_fts.rowid
+    WHERE food_fts MATCH ?
+    ORDER BY
+        CASE
+            WHEN f.data_type = 'foundation_food' THEN 1
+            ELSE 2
+        END,
+        f.description
+    LIMIT ?
+"""
+
+SQL_SEARCH_LIKE = """
+    SELECT fdc_id, description, data_type
+    FROM food
+    WHERE description LIKE ? COLLATE NOCASE
+    ORDER BY
+        CASE
+            WHEN data_type = 'foundation_food' THEN 1
+            ELSE 2
+        END,
+        description
+    LIMIT ?
+"""
+
+SQL_NUTRIENTS = """
+    SELECT
+        n.name as nutrient_name,
+        fn.amount,
+        n.unit_name
+    FROM food_nutrient fn
+    JOIN nutrient n ON fn.nutrient_id = n.id
+    WHERE fn.fdc_id = ?
+        AND fn.amount IS NOT NULL
+    ORDER BY n.rank
+"""
+
+# Map nutrient IDs to macro names
+# 1008 = Energy (calories), 1003 = Protein, 1004 = Fat
+# 1005 = Carbs, 1079 = Fiber, 1093 = Sodium
+NUTRIENT_MAP = {
+    1008: 'calories',
+    1003: 'protein',
+    1004: 'fat',
+    1005: 'carbs',
+    1079: 'fiber',
+    1093: 'sodium'
+}
+
+SQL_MACROS = """
+    SELECT
+        fn.nutrient_id,
+        fn.amount
+    FROM food_nutrient fn
+    WHERE fn.fdc_id = ?
+        AND fn.nutrient_id IN (1008, 1003, 1004, 1005, 1079, 1093)
+        AND fn.amount IS NOT NULL
+"""
+
+def _ensure_food_fts(conn):
+    """One-time migration: build an FTS5 index over food descriptions"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='food_fts'"
+    ).fetchone()
+    if not exists:
+        conn.execute("""
+            CREATE VIRTUAL TABLE food_fts USING fts5(
+                description, content='food', content_rowid='fdc_id'
+            )
+        """)
+        conn.execute("INSERT INTO food_fts(rowid, description) SELECT fdc_id, description FROM food")
+        conn.commit()
+
+def _ensure_food_indexes(conn):
+    """One-time migration: covering index for the macro lookups.
+
+    Including amount makes the index covering, so the macro queries are
+    answered from the index alone with no table probes.
+    """
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_fn_fdc_nid
+        ON food_nutrient(fdc_id, nutrient_id, amount)
+    """)
+    # Lets the LIKE fallback in search_foods stay index-assisted for
+    # case-insensitive prefix queries
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_food_desc_nocase
+        ON food(description COLLATE NOCASE)
+    """)
+    conn.commit()
+
 # Connect to food database
+@st.cache_resource
 def get_food_db_connection():
-    """Create connection to the food database"""
-    return sqlite3.connect('food_nutrition.db')
+    """Create a single shared connection to the food database (read-only data)"""
+    conn = sqlite3.connect('food_nutrition.db', check_same_thread=False, uri=True)
+    # Tune SQLite for read-heavy access: WAL journal, in-memory temp tables,
+    # a 64MB page cache, and memory-mapped I/O for the hot search path
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536")
+    conn.execute("PRAGMA mmap_size=268435456")
+    _ensure_food_fts(conn)
+    _ensure_food_indexes(conn)
+    # The app never writes to this database after migration
+    conn.execute("PRAGMA query_only=1")
+    return conn
+
+@st.cache_resource
+def get_food_db_lock():
+    """Lock guarding the shared food database connection across threads"""
+    return threading.Lock()
 
+@st.cache_data(ttl=300, max_entries=256)
 def search_foods(search_term, limit=20):
     """Search for foods in the database, prioritizing foundation foods"""
     conn = get_food_db_connection()
-    query = """
-        SELECT fdc_id, description, data_type
-        FROM food
-        WHERE description LIKE ?
-        ORDER BY 
-            CASE 
-                WHEN data_type = 'foundation_food' THEN 1
-                ELSE 2
-            END,
-            description
-        LIMIT ?
-    """
-    df = pd.read_sql_query(query, conn, params=(f'%{search_term}%', limit))
-    conn.close()
+
+    # Build an FTS5 prefix query from the user's words, e.g. "chicken brea"
+    # becomes 'chicken* brea*'. Tokens are stripped of FTS syntax characters.
+    tokens = [t for t in ''.join(c if c.isalnum() else ' ' for c in search_term).split() if t]
+    if not tokens:
+        return pd.DataFrame(columns=['fdc_id', 'description', 'data_type'])
+    match_expr = ' '.join(f'{t}*' for t in tokens)
+
+    # Single-word fallback terms can use an index-assisted prefix match on
+    # the NOCASE description index; multi-word terms still need a substring scan
+    if len(tokens) == 1:
+        like_pattern = f'{tokens[0]}%'
+    else:
+        like_pattern = f'%{search_term}%'
+
+    with get_food_db_lock():
+        try:
+            df = pd.read_sql_query(SQL_SEARCH_FTS, conn, params=(match_expr, limit))
+        except (sqlite3.OperationalError, pd.errors.DatabaseError):
+            # Fall back to LIKE if the FTS index is unavailable
+            df = pd.read_sql_query(SQL_SEARCH_LIKE, conn, params=(like_pattern, limit))
     return df
 
+@st.cache_data(ttl=300, max_entries=256, show_spinner=False)
+def search_food_options(search_term, limit=20):
+    """Search results plus the selectbox label -> food mapping, memoized together"""
+    search_results = search_foods(search_term, limit)
+    food_options = {
+        f"{desc} ({dt})": {
+            'fdc_id': fid,
+            'description': desc
+        }
+        for desc, dt, fid in search_results[
+            ['description', 'data_type', 'fdc_id']
+        ].itertuples(index=False, name=None)
+    }
+    return search_results, food_options
+
+@st.cache_data(ttl=None, max_entries=512)
 def get_food_nutrients(fdc_id):
     """Get all nutrients for a specific food"""
     conn = get_food_db_connection()
-    query = """
-        SELECT 
-            n.name as nutrient_name,
-            fn.amount,
-            n.unit_name
-        FROM food_nutrient fn
-        JOIN nutrient n ON fn.nutrient_id = n.id
-        WHERE fn.fdc_id = ?
-            AND fn.amount IS NOT NULL
-        ORDER BY n.rank
-    """
-    df = pd.read_sql_query(query, conn, params=(fdc_id,))
-    conn.close()
+    with get_food_db_lock():
+        df = pd.read_sql_query(SQL_NUTRIENTS, conn, params=(fdc_id,))
     return df
 
+@st.cache_data(ttl=None, max_entries=512)
 def get_food_macros(fdc_id):
     """Get macro nutrients (calories, protein, fat, carbs, fiber, sodium) for a food per 100g"""
     conn = get_food_db_connection()
-    
-    # Query for specific nutrient IDs we need
-    # 1008 = Energy (calories), 1003 = Protein, 1004 = Fat
-    # 1005 = Carbs, 1079 = Fiber, 1093 = Sodium
-    query = """
-        SELECT 
-            fn.nutrient_id,
-            fn.amount
-        FROM food_nutrient fn
-        WHERE fn.fdc_id = ?
-            AND fn.nutrient_id IN (1008, 1003, 1004, 1005, 1079, 1093)
-            AND fn.amount IS NOT NULL
-    """
-    
-    df = pd.read_sql_query(query, conn, params=(fdc_id,))
-    conn.close()
-    
-    # Map nutrient IDs to names
-    nutrient_map = {
-        1008: 'calories',
-        1003: 'protein',
-        1004: 'fat',
-        1005: 'carbs',
-        1079: 'fiber',
-        1093: 'sodium'
-    }
-    
-    # Initialize with zeros
+
+    # The result is at most 6 rows, so a raw cursor is much cheaper than
+    # building a DataFrame
+    with get_food_db_lock():
+        cur = conn.cursor()
+        rows = cur.execute(SQL_MACROS, (fdc_id,)).fetchall()
+
     macros = {
         'calories': 0.0,
         'protein': 0.0,
@@ -148,18 +351,10 @@ def get_food_macros(fdc_id):
         'fiber': 0.0,
         'sodium': 0.0
     }
-    
-    # Fill in the values we have
-    for _, row in df.iterrows():
-        nutrient_id = row['nutrient_id']
-        amount = row['amount']
-        
-        if nutrient_id in nutrient_map:
-            macros[nutrient_map[nutrient_id]] = amount
-    
+    macros.update({NUTRIENT_MAP[nid]: amt for nid, amt in rows})
     return macros
 
-
+@lru_cache(maxsize=256)
 def calculate_macros(weight, target_calories, fat_percentage=0.25, carb_percentage=None, lean_body_mass=None):
     """
     Calculate macro breakdown based on weight and target calories.
@@ -201,6 +396,7 @@ def calculate_macros(weight, target_calories, fat_percentage=0.25, carb_percenta
         'carb_calories': carb_calories
     }
 
+@lru_cache(maxsize=32)
 def calculate_micros(days_to_goal):
     """
     Calculate micronutrient targets based on days to goal.
@@ -229,20 +425,42 @@ def calculate_micros(days_to_goal):
         'sodium_mg': sodium_mg
     }
 
-def adjust_calories_based_on_progress(base_calories, current_weight, target_weight, days_to_goal, session, username, current_date):
+@st.cache_data(ttl=60, show_spinner=False)
+def _past_meal_logs(username, log_date, meal_category):
+    """Plain-value rows for one past meal, fetched only once it is selected"""
+    with Session() as session:
+        logs = session.query(FoodLog).filter_by(
+            username=username,
+            log_date=log_date,
+            meal_category=meal_category
+        ).all()
+        return [
+            {
+                'food_name': log.food_name,
+                'calories': log.calories,
+                'protein': log.protein,
+                'fat': log.fat,
+                'carbs': log.carbs,
+                'fiber': log.fiber,
+                'sodium': log.sodium
+            }
+            for log in logs
+        ]
+
+@lru_cache(maxsize=256)
+def adjust_calories_based_on_progress(base_calories, current_weight, target_weight, days_to_goal, actual_weight):
     """
     Adjust calorie targets based on actual weight progress vs target progression.
     Only adjusts when more than 3 days out from target.
-    
+
     Args:
         base_calories: The baseline calorie calculation
         current_weight: Current weight in lbs
         target_weight: Target weight in lbs
         days_to_goal: Days until target date
-        session: Database session to query weight logs
-        username: Username to look up weight history
-        current_date: Current date being viewed
-    
+        actual_weight: Most recent logged weight on or before the viewed
+            date (from load_food_log_context), or None if never logged
+
     Returns:
         Adjusted calorie target and adjustment info dict
     """
@@ -252,23 +470,14 @@ def adjust_calories_based_on_progress(base_calories, current_weight, target_weig
             'adjusted': False,
             'reason': 'Within 3 days of target - using standard protocol'
         }
-    
-    # Get most recent weight log
-    latest_weight_log = session.query(WeightLog).filter_by(
-        username=username
-    ).filter(
-        WeightLog.log_date <= current_date
-    ).order_by(WeightLog.log_date.desc()).first()
-    
-    if not latest_weight_log:
+
+    if actual_weight is None:
         return base_calories, {
             'adjusted': False,
             'reason': 'No weight logged yet - log your weight to enable dynamic adjustments',
             'needs_weight_log': True
         }
-    
-    actual_weight = latest_weight_log.weight
-    
+
     # Calculate where weight should be (5% above target when 3+ days out)
     target_weight_at_this_stage = target_weight * 1.05
     
@@ -303,6 +512,7 @@ def adjust_calories_based_on_progress(base_calories, current_weight, target_weig
         'difference': weight_difference
     }
 
+@lru_cache(maxsize=256)
 def calculate_bmr_and_calories(weight, height, bodyfat_percentage):
     """
     Calculate BMR and adjust for body composition.
@@ -330,22 +540,60 @@ def calculate_bmr_and_calories(weight, height, bodyfat_percentage):
     
     return bmr
 
+# (activity multiplier, fat % of calories) by days to goal:
+# 3 = very active / training day, 2 = moderately active,
+# 1 = lightly active / rest day, anything else defaults to moderate activity
+ACTIVITY = {
+    3: (1.725, 0.25),
+    2: (1.55, 0.35),
+    1: (1.375, 0.45)
+}
+ACTIVITY_DEFAULT = (1.725, 0.25)
+
+@lru_cache(maxsize=256)
+def compute_targets(weight, height, bodyfat_percentage, days_to_goal):
+    """BMR, base calorie target, and fat percentage for a given day"""
+    bmr = calculate_bmr_and_calories(weight, height, bodyfat_percentage)
+    multiplier, fat_pct = ACTIVITY.get(days_to_goal, ACTIVITY_DEFAULT)
+    return bmr, bmr * multiplier, fat_pct
+
 # Initialize session state
-if 'page' not in st.session_state:
-    st.session_state.page = 'login'
-if 'logged_in_user' not in st.session_state:
-    st.session_state.logged_in_user = None
-if 'current_date' not in st.session_state:
-    st.session_state.current_date = datetime.today().date()
-if 'selected_food' not in st.session_state:
-    st.session_state.selected_food = None
-if 'show_weight_form' not in st.session_state:
-    st.session_state.show_weight_form = False
-if 'selected_meal_category' not in st.session_state:
-    st.session_state.selected_meal_category = 'Breakfast'
-if 'editing_food_id' not in st.session_state:
-    st.session_state.editing_food_id = None
+for key, default in {
+    'page': 'login',
+    'logged_in_user': None,
+    'current_date': datetime.today().date(),
+    'selected_food': None,
+    'show_weight_form': False,
+    'selected_meal_category': 'Breakfast',
+    'editing_food_id': None,
+    'food_log_version': 0,
+}.items():
+    st.session_state.setdefault(key, default)
+
 
+@st.cache_data(max_entries=32)
+def _profile_summary_df(weight, target_weight, height, bodyfat_percentage, target_date, days_to_goal):
+    """Small summary table, cached so reruns skip DataFrame construction"""
+    return pd.DataFrame({
+        'Metric': ['Current Weight', 'Target Weight', 'Height', 'Body Fat %', 'Target Date', 'Days to Goal'],
+        'Value': [
+            f"{weight} lbs",
+            f"{target_weight} lbs",
+            f"{height} inches",
+            f"{bodyfat_percentage}%" if bodyfat_percentage > 0 else "Not provided",
+            target_date.strftime('%Y-%m-%d'),
+            f"{days_to_goal} days"
+        ]
+    })
+
+@st.cache_data(max_entries=32)
+def _macro_details_df(protein_g, fat_g, carb_g, protein_cal, fat_cal, carb_cal):
+    """Macro breakdown table, cached so reruns skip DataFrame construction"""
+    return pd.DataFrame({
+        'Macro': ['Protein', 'Fat', 'Carbs'],
+        'Grams': [protein_g, fat_g, carb_g],
+        'Calories': [protein_cal, fat_cal, carb_cal]
+    })
 
 def login_page():
     st.title("🏋️ Weight Tracker - Login")
@@ -393,11 +641,7 @@ def profile_page():
     st.title(f"📊 Profile Setup - Welcome {st.session_state.logged_in_user}!")
     
     # Check if profile already exists
-    session = Session()
-    existing_profile = session.query(UserProfile).filter_by(
-        username=st.session_state.logged_in_user
-    ).first()
-    session.close()
+    existing_profile = get_profile(st.session_state.logged_in_user)
     
     # Pre-fill if profile exists
     default_weight = existing_profile.weight if existing_profile else 0.0
@@ -443,41 +687,26 @@ def profile_page():
     # Calculate and display macros dynamically (outside form)
     if weight > 0 and height > 0:
         st.subheader("📊 Your Macro Breakdown")
-        
-        # Calculate BMR using body fat if provided
-        bmr = calculate_bmr_and_calories(weight, height, bodyfat_percentage)
-        
+
         # Calculate lean body mass for protein calculation
         lean_body_mass = None
         if bodyfat_percentage and bodyfat_percentage > 0:
             lean_body_mass = weight * (1 - bodyfat_percentage / 100)
             st.info(f"💪 **Lean Body Mass:** {lean_body_mass:.1f} lbs → **Protein Target:** {lean_body_mass * 1.2:.1f}g (1.2g per lb LBM)")
-        
+
         # Calculate deficit/surplus based on goal
         days_to_goal = (target_date - today_date).days
         weight_change = target_weight - weight
 
-        # Determine activity level and macro split based on days to goal
-        if days_to_goal == 3:  # Very active - training day
-            base_calories = bmr * 1.725
-            fat_pct = 0.25
-        elif days_to_goal == 2:  # Moderately active
-            base_calories = bmr * 1.55
-            fat_pct = 0.35
-        elif days_to_goal == 1:  # Lightly active - rest day
-            base_calories = bmr * 1.375
-            fat_pct = 0.45
-        else:  # Default to moderate activity
-            base_calories = bmr * 1.725
-            fat_pct = 0.25
-        
+        # BMR plus activity-level calories and macro split for this day
+        bmr, base_calories, fat_pct = compute_targets(weight, height, bodyfat_percentage, days_to_goal)
+
         # Adjust calories based on actual progress (only when >3 days out)
-        session_temp = Session()
+        context = load_food_log_context(st.session_state.logged_in_user, today_date)
         target_calories, adjustment_info = adjust_calories_based_on_progress(
-            base_calories, weight, target_weight, days_to_goal, 
-            session_temp, st.session_state.logged_in_user, today_date
+            base_calories, weight, target_weight, days_to_goal,
+            context.latest_weight if context else None
         )
-        session_temp.close()
         
         # Calculate macros with adjusted calories
         macros = calculate_macros(weight, target_calories, fat_percentage=fat_pct, lean_body_mass=lean_body_mass)
@@ -528,27 +757,20 @@ def profile_page():
         
         # Display summary
         st.subheader("Profile Summary")
-        df = pd.DataFrame({
-            'Metric': ['Current Weight', 'Target Weight', 'Height', 'Body Fat %', 'Target Date', 'Days to Goal'],
-            'Value': [
-                f"{weight} lbs",
-                f"{target_weight} lbs",
-                f"{height} inches",
-                f"{bodyfat_percentage}%" if bodyfat_percentage > 0 else "Not provided",
-                target_date.strftime('%Y-%m-%d'),
-                f"{days_to_goal} days"
-            ]
-        })
-        st.dataframe(df, hide_index=True)
-        
+        st.dataframe(
+            _profile_summary_df(weight, target_weight, height, bodyfat_percentage, target_date, days_to_goal),
+            hide_index=True
+        )
+
         # Macro breakdown chart
-        macro_df = pd.DataFrame({
-            'Macro': ['Protein', 'Fat', 'Carbs'],
-            'Grams': [int(macros['protein_grams']), int(macros['fat_grams']), int(macros['carb_grams'])],
-            'Calories': [int(macros['protein_calories']), int(macros['fat_calories']), int(macros['carb_calories'])]
-        })
         st.subheader("Macro Details")
-        st.dataframe(macro_df, hide_index=True)
+        st.dataframe(
+            _macro_details_df(
+                int(macros['protein_grams']), int(macros['fat_grams']), int(macros['carb_grams']),
+                int(macros['protein_calories']), int(macros['fat_calories']), int(macros['carb_calories'])
+            ),
+            hide_index=True
+        )
     
     with st.form("profile_form"):
         st.write("### Save Your Profile")
@@ -560,27 +782,33 @@ def profile_page():
             logout_button = st.form_submit_button("Logout")
         
         if submit_button:
-            session = Session()
-            
-            # Delete existing profile if it exists
-            session.query(UserProfile).filter_by(
-                username=st.session_state.logged_in_user
-            ).delete()
-            
-            # Create new profile
-            new_profile = UserProfile(
-                username=st.session_state.logged_in_user,
-                weight=weight,
-                target_weight=target_weight,
-                today_date=today_date,
-                target_date=target_date,
-                bodyfat_percentage=bodyfat_percentage,
-                height=height
-            )
-            session.add(new_profile)
-            session.commit()
-            session.close()
-            
+            # Plain SQL in one transaction - the ORM unit-of-work machinery
+            # is overkill for a single delete + insert
+            with engine.begin() as conn:
+                conn.execute(
+                    text("DELETE FROM profiles WHERE username = :username"),
+                    {'username': st.session_state.logged_in_user}
+                )
+                conn.execute(
+                    text("""
+                        INSERT INTO profiles
+                            (username, weight, target_weight, today_date, target_date, bodyfat_percentage, height)
+                        VALUES
+                            (:username, :weight, :target_weight, :today_date, :target_date, :bodyfat_percentage, :height)
+                    """),
+                    {
+                        'username': st.session_state.logged_in_user,
+                        'weight': weight,
+                        'target_weight': target_weight,
+                        'today_date': today_date,
+                        'target_date': target_date,
+                        'bodyfat_percentage': bodyfat_percentage,
+                        'height': height
+                    }
+                )
+
+            load_food_log_context.clear()
+            _load_progress_context.clear()
             st.success("✅ Profile saved successfully!")
         
         if logout_button:
@@ -599,857 +827,1145 @@ def profile_page():
             st.session_state.page = 'progress'
             st.rerun()
 
-def food_log_page():
-    st.title(f"🍽️ Food Log - {st.session_state.logged_in_user}")
-    
-    # Navigation
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        if st.button("← Back to Profile"):
-            st.session_state.page = 'profile'
-            st.rerun()
-    with col2:
-        if st.button("📈 Progress"):
-            st.session_state.page = 'progress'
-            st.rerun()
-    with col3:
-        st.write(f"**Date:** {st.session_state.current_date}")
-    with col4:
-        if st.button("Logout"):
-            st.session_state.logged_in_user = None
-            st.session_state.page = 'login'
-            st.rerun()
-    
-    # Multi-day navigation for past days
+# Atwater kcal-per-gram factors shared by the manual-entry and edit forms
+_P, _F, _C = 4.0, 9.0, 4.0
+
+MEAL_CATEGORIES = ['Breakfast', 'Lunch', 'Dinner', 'Snacks']
+
+# Static reference content for the food-log page; interned once at import
+# instead of being rebuilt on every rerun
+_LOW_FIBER_MD = """
+        **Best options for cutting weight before weigh-in:**
+
+        ### 🥩 Meats (0g fiber)
+        **Beef:**
+        - **Beef, round, eye of round** - 122 cal, 23.4g protein, 50mg sodium
+        - **Beef, porterhouse steak** - 145 cal, 22.7g protein, 43mg sodium
+        - **Beef, top loin steak** - 155 cal, 22.8g protein, 45mg sodium
+        - **Beef, tenderloin roast** - 176 cal, 27.7g protein, 54mg sodium
+        - **Beef, t-bone steak** - 219 cal, 27.3g protein, 67mg sodium
+        - **Beef, top round roast** - Available in database
+        - **Frankfurter, beef, unheated** - Available in database
+
+        **Chicken:**
+        - **Chicken, breast** (skinless, boneless, cooked, braised)
+        - **Chicken, drumstick** (meat only, cooked, braised)
+
+        **Pork:**
+        - **Pork, bacon** (cooked, restaurant)
+        - **Sausage, Italian, pork, mild** (cooked, pan-fried)
+        - **Sausage, pork, chorizo** (link or ground, cooked, pan-fried)
+        - **Restaurant, Chinese, sweet and sour pork**
+        - **Restaurant, Latino, tamale, pork**
+
+        **Turkey:**
+        - **Turkey, ground** (93% lean, 7% fat, pan-broiled crumbles)
+        - **Sausage, turkey, breakfast links, mild, raw**
+
+        **Ham:**
+        - **Ham, sliced, pre-packaged** (deli meat, 96% fat free, water added)
+
+        **Other Sausages:**
+        - **Sausage, breakfast sausage, beef** (pre-cooked, unprepared)
+
+        ### 🍞 Grains & Breads
+        **Breads:**
+        - **Bread, white, commercially prepared**
+
+        **Flours:**
+        - **Rice flour, white** - 359 cal, 0.5g fiber, 5mg sodium
+        - **Flour, bread, white** (enriched, unbleached)
+
+        **Other Grains:**
+        - **Restaurant, Chinese, fried rice, without meat**
+
+        ### 🍇 Fruits (Low fiber: 0.2-2g)
+        - **Grapefruit juice** - 37 cal, 0.2g fiber, 1mg sodium
+        - **Cantaloupe** - 34 cal, 0.8g fiber, 30mg sodium
+        - **Bananas** - 97 cal, 1.7g fiber, 0mg sodium
+        - **Apples (Honeycrisp)** - 60 cal, 1.7g fiber, 0mg sodium
+        - **Peaches** - 42 cal, 1.5g fiber, 13mg sodium
+        - **Nectarines** - 39 cal, 1.5g fiber, 13mg sodium
+        - **Strawberries** - 31 cal, 1.8g fiber, 10mg sodium
+        - **Oranges** - 47 cal, 2.0g fiber, 9mg sodium
+
+        ### 🥛 Dairy
+        - **Greek yogurt, strawberry, nonfat** - 83 cal, 8.1g protein, 0.6g fiber, 32mg sodium
+
+        ### 🍚 Other
+        - **Onions, white** - 35 cal, 1.2g fiber, 2mg sodium
+
+        💡 *All nutrition values per 100g unless otherwise noted. All beef and meat options have 0g fiber!*
+        💡 *Search the database for any of these items to get complete nutritional information.*
+        """
+
+@dataclass(slots=True)
+class DayState:
+    """Everything the food-log page reads for one (user, date)."""
+    food_logs: list
+    logs_by_id: dict
+    meal_totals: dict
+    day_df: pd.DataFrame
+    frames_by_category: dict
+    past_meal_groups: list
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _load_day_state(username, current_date, version):
+    """Fetch and aggregate one day's food-log data in a single session.
+
+    version is st.session_state.food_log_version; mutations bump it so
+    the cache entry is invalidated immediately instead of waiting out the
+    ttl. Pure widget reruns reuse the cached DayState and skip the DB.
+    """
+    with Session() as session:
+
+        # Day's rows as plain column tuples - no ORM identity-map
+        # bookkeeping and no chance of lazy loads downstream
+        food_logs = session.execute(
+            select(
+                FoodLog.id, FoodLog.food_name, FoodLog.calories,
+                FoodLog.protein, FoodLog.fat, FoodLog.carbs,
+                FoodLog.fiber, FoodLog.sodium, FoodLog.meal_category
+            ).where(
+                FoodLog.username == username,
+                FoodLog.log_date == current_date
+            )
+        ).all()
+
+        # Totals by meal computed in the database instead of Python loops
+        grouped_totals = session.query(
+            FoodLog.meal_category,
+            func.sum(FoodLog.calories),
+            func.sum(FoodLog.protein),
+            func.sum(FoodLog.fat),
+            func.sum(FoodLog.carbs),
+            func.sum(FoodLog.fiber),
+            func.sum(FoodLog.sodium),
+            func.count(FoodLog.id)
+        ).filter_by(
+            username=username,
+            log_date=current_date
+        ).group_by(FoodLog.meal_category).all()
+
+        # Unique past meals (last 30 days, excluding the current date),
+        # grouped and summed in the database - one row per (date, meal)
+        past_date_limit = current_date - timedelta(days=30)
+        past_meal_groups = session.query(
+            FoodLog.log_date,
+            FoodLog.meal_category,
+            func.count(FoodLog.id),
+            func.sum(FoodLog.calories)
+        ).filter(
+            FoodLog.username == username,
+            FoodLog.log_date >= past_date_limit,
+            FoodLog.log_date < current_date
+        ).group_by(
+            FoodLog.log_date, FoodLog.meal_category
+        ).order_by(FoodLog.log_date.desc()).all()
+
+
+    meal_totals = {
+        category: {
+            'calories': 0.0, 'protein': 0.0, 'fat': 0.0, 'carbs': 0.0,
+            'fiber': 0.0, 'sodium': 0.0, 'count': 0
+        }
+        for category in MEAL_CATEGORIES
+    }
+    for category, cal, prot, fat_g, carb_g, fiber_g, sodium_mg, count in grouped_totals:
+        meal_totals[category or 'Snacks'] = {
+            'calories': cal,
+            'protein': prot,
+            'fat': fat_g,
+            'carbs': carb_g,
+            'fiber': fiber_g,
+            'sodium': sodium_mg,
+            'count': count
+        }
+
+    # Index the day's logs by id so edit/delete don't re-query the DB
+    logs_by_id = {log.id: log for log in food_logs}
+
+    # One DataFrame over the day's logs, shared by all four meal tabs
+    day_df = pd.DataFrame([
+        {
+            'Food': log.food_name,
+            'Calories': int(log.calories),
+            'Protein': f"{log.protein:.1f}g",
+            'Fat': f"{log.fat:.1f}g",
+            'Carbs': f"{log.carbs:.1f}g",
+            'Fiber': f"{log.fiber:.1f}g",
+            'Sodium': f"{int(log.sodium)}mg",
+            'meal_category': log.meal_category
+        }
+        for log in food_logs
+    ])
+
+    # Pre-split the rows per meal once; empty tabs then cost a single dict
+    # lookup instead of a boolean-mask scan over the whole day
+    frames_by_category = (
+        dict(tuple(day_df.groupby('meal_category', sort=False)))
+        if not day_df.empty else {}
+    )
+
+    return DayState(
+        food_logs=food_logs,
+        logs_by_id=logs_by_id,
+        meal_totals=meal_totals,
+        day_df=day_df,
+        frames_by_category=frames_by_category,
+        past_meal_groups=past_meal_groups
+    )
+
+
+@st.fragment
+def _add_food_fragment(meal_categories):
+    """Database search, add-to-log and manual-entry UI.
+
+    Runs as a fragment so search keystrokes and radio flips rerun only
+    this region, not the whole page pipeline. Mutations open their own
+    session and call st.rerun(), which refreshes the full page.
+    """
+    # Food database search section
     st.divider()
-    st.subheader("📅 Date Navigation")
+    st.subheader("🔍 Add Food")
     
-    col1, col2, col3, col4 = st.columns([1, 2, 2, 1])
+    # Meal category selector
+    selected_category = st.radio(
+        "Select meal:",
+        meal_categories,
+        horizontal=True,
+        key="meal_category_selector"
+    )
+    st.session_state.selected_meal_category = selected_category
     
-    with col1:
-        # Previous day button
-        if st.button("◀ Previous", use_container_width=True):
-            st.session_state.current_date = st.session_state.current_date - timedelta(days=1)
-            st.session_state.show_weight_form = False
-            st.rerun()
+    # Low fiber/sodium reference
+    with st.expander("📋 Quick Reference: Low Fiber & Low Sodium Foods"):
+        st.markdown(_LOW_FIBER_MD)
     
-    with col2:
-        # Date picker for past days only
-        max_date = datetime.today().date()
-        selected_date = st.date_input(
-            "Select Date",
-            value=st.session_state.current_date,
-            max_value=max_date,
-            key="date_picker"
-        )
-        
-        # Update current_date if changed
-        if selected_date != st.session_state.current_date:
-            st.session_state.current_date = selected_date
-            st.session_state.show_weight_form = False
-            st.rerun()
+    st.write("")  # Add some spacing
     
-    with col3:
-        # Show days from today
-        days_ago = (datetime.today().date() - st.session_state.current_date).days
-        if days_ago == 0:
-            date_label = "📍 Today"
-        elif days_ago == 1:
-            date_label = "📅 Yesterday"
-        else:
-            date_label = f"📅 {days_ago} days ago"
-        
-        st.info(date_label)
+    search_term = st.text_input("Search for a food:", placeholder="e.g., chicken, apple, rice")
     
-    with col4:
-        # Next day button (only show if not viewing today)
-        today = datetime.today().date()
-        if st.session_state.current_date < today:
-            if st.button("Next ▶", use_container_width=True):
-                st.session_state.current_date = st.session_state.current_date + timedelta(days=1)
-                st.session_state.show_weight_form = False
-                st.rerun()
-        else:
-            st.button("Today", disabled=True, use_container_width=True)
-    
-    st.divider()
-    
-    # Get user profile for targets
-    session = Session()
-    profile = session.query(UserProfile).filter_by(
-        username=st.session_state.logged_in_user
-    ).first()
-    
-    if not profile:
-        st.warning("Please complete your profile first!")
-        session.close()
-        return
-    
-    # Weight tracking section - date aware title
-    today = datetime.today().date()
-    if st.session_state.current_date == today:
-        st.subheader("⚖️ Today's Weight")
-    else:
-        days_ago = (today - st.session_state.current_date).days
-        if days_ago == 1:
-            st.subheader("⚖️ Yesterday's Weight")
-        else:
-            st.subheader(f"⚖️ Weight on {st.session_state.current_date.strftime('%B %d, %Y')}")
-    
-    # Check if weight already logged for this date
-    existing_weight_log = session.query(WeightLog).filter_by(
-        username=st.session_state.logged_in_user,
-        log_date=st.session_state.current_date
-    ).first()
+    if search_term:
+        with st.spinner("Searching..."):
+            search_results, food_options = search_food_options(search_term)
+
+            if not search_results.empty:
+                st.write(f"Found {len(search_results)} results:")
+
+                selected_food_key = st.selectbox(
+                    "Select a food:",
+                    options=["-- Select --"] + list(food_options.keys()),
+                    key="food_selector"
+                )
+                
+                if selected_food_key != "-- Select --":
+                    if st.button("Add This Food", type="primary"):
+                        st.session_state.selected_food = food_options[selected_food_key]
+                        st.rerun()
+            else:
+                st.info("No foods found. Try a different search term.")
     
-    # Show weight info and buttons when form is NOT showing
-    if existing_weight_log and not st.session_state.show_weight_form:
-        col1, col2 = st.columns([3, 1])
-        with col1:
-            st.success(f"✅ Weight logged: **{existing_weight_log.weight} lbs**")
-            if existing_weight_log.notes:
-                st.info(f"Note: {existing_weight_log.notes}")
-        with col2:
-            if st.button("Update Weight"):
-                st.session_state.show_weight_form = True
+    # Display selected food details and add form
+    if st.session_state.selected_food:
+        st.divider()
+        st.subheader(f"➕ Add: {st.session_state.selected_food['description']}")
+        
+        with st.spinner("Loading nutritional information..."):
+            macros_data = get_food_macros(st.session_state.selected_food['fdc_id'])
+            nutrients_data = get_food_nutrients(st.session_state.selected_food['fdc_id'])
+        
+        # Check if food has any nutritional data
+        has_data = macros_data['calories'] > 0 or macros_data['protein'] > 0 or macros_data['fat'] > 0 or macros_data['carbs'] > 0
+        
+        if not has_data:
+            st.warning("""
+                ⚠️ **No nutritional data available for this food.**
+                
+                This food item doesn't have nutrient information in the database. 
+                Try searching for a similar food or use manual entry below.
+                
+                💡 Tip: Foods marked as "foundation_food" usually have complete nutrition data.
+            """)
+            
+            if st.button("Clear Selection"):
+                st.session_state.selected_food = None
                 st.rerun()
-    elif not existing_weight_log and not st.session_state.show_weight_form:
-        if st.session_state.current_date == datetime.today().date():
-            st.info("⚠️ No weight logged for today")
-            button_text = "Log Today's Weight"
         else:
-            st.info(f"⚠️ No weight logged for {st.session_state.current_date.strftime('%B %d, %Y')}")
-            button_text = "Log Weight for This Day"
-        
-        if st.button(button_text):
-            st.session_state.show_weight_form = True
-            st.rerun()
-    
-    # Weight entry form - shows when flag is True
-    if st.session_state.show_weight_form:
-        with st.form("weight_log_form"):
-            st.write("### Log Your Weight")
-            col1, col2 = st.columns(2)
+            # Display macro summary (per 100g)
+            st.info("📏 **Nutrition values shown per 100g**")
+            
+            col1, col2, col3, col4 = st.columns(4)
             with col1:
-                current_weight = st.number_input(
-                    "Weight (lbs)", 
-                    min_value=0.0,
-                    value=existing_weight_log.weight if existing_weight_log else profile.weight,
-                    step=0.1
-                )
+                st.metric("Calories", f"{macros_data['calories']:.0f}")
             with col2:
-                weight_notes = st.text_input(
-                    "Notes (optional)",
-                    value=existing_weight_log.notes if existing_weight_log else "",
-                    placeholder="e.g., morning, after workout"
-                )
+                st.metric("Protein", f"{macros_data['protein']:.1f}g")
+            with col3:
+                st.metric("Fat", f"{macros_data['fat']:.1f}g")
+            with col4:
+                st.metric("Carbs", f"{macros_data['carbs']:.1f}g")
             
             col1, col2 = st.columns(2)
             with col1:
-                save_weight = st.form_submit_button("Save Weight", type="primary")
+                st.metric("Fiber", f"{macros_data['fiber']:.1f}g")
             with col2:
-                cancel_weight = st.form_submit_button("Cancel")
+                st.metric("Sodium", f"{macros_data['sodium']:.0f}mg")
             
-            if save_weight:
-                if existing_weight_log:
-                    # Update existing log
-                    existing_weight_log.weight = current_weight
-                    existing_weight_log.notes = weight_notes
+            # Show expandable full nutrient details
+            with st.expander("📋 View All Nutrients"):
+                if not nutrients_data.empty:
+                    st.dataframe(nutrients_data, hide_index=True, use_container_width=True)
                 else:
-                    # Create new log
-                    new_weight_log = WeightLog(
-                        username=st.session_state.logged_in_user,
-                        log_date=st.session_state.current_date,
-                        weight=current_weight,
-                        notes=weight_notes
-                    )
-                    session.add(new_weight_log)
-                
-                session.commit()
-                st.session_state.show_weight_form = False
-                st.success(f"✅ Weight saved: {current_weight} lbs")
-                st.rerun()
-            
-            if cancel_weight:
-                st.session_state.show_weight_form = False
-                st.rerun()
-    
-    st.divider()
-    
-    # Calculate targets using body composition
-    bmr = calculate_bmr_and_calories(profile.weight, profile.height, profile.bodyfat_percentage)
-    
-    # Calculate lean body mass for protein
-    lean_body_mass = None
-    if profile.bodyfat_percentage and profile.bodyfat_percentage > 0:
-        lean_body_mass = profile.weight * (1 - profile.bodyfat_percentage / 100)
-    
-    days_to_goal = (profile.target_date - st.session_state.current_date).days
-    
-    # Determine base calories and fat percentage
-    if days_to_goal == 3:
-        base_calories = bmr * 1.725
-        fat_pct = 0.25
-    elif days_to_goal == 2:
-        base_calories = bmr * 1.55
-        fat_pct = 0.35
-    elif days_to_goal == 1:
-        base_calories = bmr * 1.375
-        fat_pct = 0.45
-    else:
-        base_calories = bmr * 1.725
-        fat_pct = 0.25
-    
-    # Adjust calories based on actual progress (only when >3 days out)
-    target_calories, adjustment_info = adjust_calories_based_on_progress(
-        base_calories, profile.weight, profile.target_weight, days_to_goal,
-        session, st.session_state.logged_in_user, st.session_state.current_date
-    )
-    
-    # Calculate macros with adjusted calories
-    macros = calculate_macros(profile.weight, target_calories, fat_percentage=fat_pct, lean_body_mass=lean_body_mass)
-    
-    micros = calculate_micros(days_to_goal)
-    
-    # Get food logs for selected date
-    food_logs = session.query(FoodLog).filter_by(
-        username=st.session_state.logged_in_user,
-        log_date=st.session_state.current_date
-    ).all()
-    
-    # Calculate totals overall and by meal
-    meal_categories = ['Breakfast', 'Lunch', 'Dinner', 'Snacks']
-    meal_totals = {}
-    
-    for category in meal_categories:
-        category_logs = [log for log in food_logs if getattr(log, 'meal_category', 'Snacks') == category]
-        meal_totals[category] = {
-            'calories': sum(log.calories for log in category_logs),
-            'protein': sum(log.protein for log in category_logs),
-            'fat': sum(log.fat for log in category_logs),
-            'carbs': sum(log.carbs for log in category_logs),
-            'fiber': sum(log.fiber for log in category_logs),
-            'sodium': sum(log.sodium for log in category_logs),
-            'count': len(category_logs)
-        }
-    
-    # Calculate overall totals
-    total_calories = sum(log.calories for log in food_logs)
-    total_protein = sum(log.protein for log in food_logs)
-    total_fat = sum(log.fat for log in food_logs)
-    total_carbs = sum(log.carbs for log in food_logs)
-    total_fiber = sum(log.fiber for log in food_logs)
-    total_sodium = sum(log.sodium for log in food_logs)
-    
-    # Display targets vs actual
-    if st.session_state.current_date == datetime.today().date():
-        st.subheader("📊 Today's Progress")
-    else:
-        st.subheader(f"📊 Progress for {st.session_state.current_date.strftime('%B %d, %Y')}")
-    
-    # Show calorie adjustment info if applicable
-    if adjustment_info.get('needs_weight_log'):
-        st.warning(f"⚠️ **Dynamic Adjustments Disabled:** {adjustment_info['reason']}\n\nLog your weight above to see automatic calorie adjustments!")
-    elif adjustment_info['adjusted']:
-        if adjustment_info['adjustment'] > 0:
-            st.success(f"📈 **Calorie Adjustment:** +{adjustment_info['adjustment']} cal/day - {adjustment_info['reason']}")
-        else:
-            st.warning(f"📉 **Calorie Adjustment:** {adjustment_info['adjustment']} cal/day - {adjustment_info['reason']}")
-    elif days_to_goal > 3:
-        st.info(f"✅ {adjustment_info['reason']}")
-    
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.metric(
-            "Calories",
-            f"{int(total_calories)}/{int(target_calories)}",
-            delta=f"{int(target_calories - total_calories)}"
-        )
-    with col2:
-        st.metric(
-            "Protein",
-            f"{int(total_protein)}/{int(macros['protein_grams'])}g",
-            delta=f"{int(macros['protein_grams'] - total_protein)}g"
-        )
-    with col3:
-        st.metric(
-            "Fat",
-            f"{int(total_fat)}/{int(macros['fat_grams'])}g",
-            delta=f"{int(macros['fat_grams'] - total_fat)}g"
-        )
-    with col4:
-        st.metric(
-            "Carbs",
-            f"{int(total_carbs)}/{int(macros['carb_grams'])}g",
-            delta=f"{int(macros['carb_grams'] - total_carbs)}g"
-        )
-    
-    col1, col2 = st.columns(2)
-    with col1:
-        st.metric(
-            "Fiber",
-            f"{int(total_fiber)}/{micros['fiber_grams']}g",
-            delta=f"{int(micros['fiber_grams'] - total_fiber)}g"
-        )
-    with col2:
-        st.metric(
-            "Sodium",
-            f"{int(total_sodium)}/{micros['sodium_mg']}mg",
-            delta=f"{int(micros['sodium_mg'] - total_sodium)}mg"
-        )
-    
-    # Display meal breakdown
-    st.divider()
-    st.subheader("🍽️ Meal Breakdown")
-    
-    # Create tabs for each meal
-    tab1, tab2, tab3, tab4 = st.tabs(["🌅 Breakfast", "☀️ Lunch", "🌙 Dinner", "🍿 Snacks"])
-    
-    tabs = [tab1, tab2, tab3, tab4]
-    emojis = ['🌅', '☀️', '🌙', '🍿']
-    
-    for idx, (category, tab) in enumerate(zip(meal_categories, tabs)):
-        with tab:
-            totals = meal_totals[category]
+                    st.info("No detailed nutrient data available")
             
-            if totals['count'] > 0:
-                col1, col2, col3, col4, col5, col6 = st.columns(6)
+            # Add to log form
+            with st.form("add_from_database"):
+                st.write("**Enter amount in grams:**")
+                grams = st.number_input(
+                    "Grams", 
+                    min_value=1.0, 
+                    value=100.0, 
+                    step=10.0,
+                    help="All nutrition values are per 100g. Enter the amount you consumed."
+                )
+                
+                # Show calculated values for the specified grams
+                multiplier = grams / 100.0
+                st.write("**Calculated nutrition for your portion:**")
+                col1, col2, col3, col4 = st.columns(4)
                 with col1:
-                    st.metric("Calories", f"{int(totals['calories'])}")
+                    st.write(f"Calories: {macros_data['calories'] * multiplier:.0f}")
                 with col2:
-                    st.metric("Protein", f"{int(totals['protein'])}g")
+                    st.write(f"Protein: {macros_data['protein'] * multiplier:.1f}g")
                 with col3:
-                    st.metric("Fat", f"{int(totals['fat'])}g")
+                    st.write(f"Fat: {macros_data['fat'] * multiplier:.1f}g")
                 with col4:
-                    st.metric("Carbs", f"{int(totals['carbs'])}g")
-                with col5:
-                    st.metric("Fiber", f"{int(totals['fiber'])}g")
-                with col6:
-                    st.metric("Sodium", f"{int(totals['sodium'])}mg")
+                    st.write(f"Carbs: {macros_data['carbs'] * multiplier:.1f}g")
                 
-                st.write("---")
+                col1, col2 = st.columns(2)
+                with col1:
+                    add_button = st.form_submit_button("Add to Log", type="primary")
+                with col2:
+                    cancel_button = st.form_submit_button("Cancel")
                 
-                # Show foods for this meal
-                category_foods = [log for log in food_logs if getattr(log, 'meal_category', 'Snacks') == category]
-                food_data = []
-                for log in category_foods:
-                    food_data.append({
-                        'Food': log.food_name,
-                        'Calories': int(log.calories),
-                        'Protein': f"{log.protein:.1f}g",
-                        'Fat': f"{log.fat:.1f}g",
-                        'Carbs': f"{log.carbs:.1f}g",
-                        'Fiber': f"{log.fiber:.1f}g",
-                        'Sodium': f"{int(log.sodium)}mg",
-                        'ID': log.id
-                    })
-                
-                if food_data:
-                    df = pd.DataFrame(food_data)
-                    st.dataframe(df.drop('ID', axis=1), hide_index=True, use_container_width=True)
-            else:
-                st.info(f"No foods logged for {category.lower()} yet.")
-    
-    # Copy Past Meals section
-    st.divider()
-    st.subheader("📋 Copy Past Meals")
-    
-    # Get unique past meals (from last 30 days, excluding today)
-    past_date_limit = st.session_state.current_date - timedelta(days=30)
-    past_food_logs = session.query(FoodLog).filter(
-        FoodLog.username == st.session_state.logged_in_user,
-        FoodLog.log_date >= past_date_limit,
-        FoodLog.log_date < st.session_state.current_date
-    ).order_by(FoodLog.log_date.desc()).all()
-    
-    if past_food_logs:
-        # Group by date and meal category
-        meals_by_date = {}
-        for log in past_food_logs:
-            date_key = log.log_date.strftime('%Y-%m-%d')
-            meal_cat = getattr(log, 'meal_category', 'Snacks')
-            
-            if date_key not in meals_by_date:
-                meals_by_date[date_key] = {}
-            if meal_cat not in meals_by_date[date_key]:
-                meals_by_date[date_key][meal_cat] = []
-            
-            meals_by_date[date_key][meal_cat].append(log)
-        
-        # Create options for selectbox
-        meal_options = []
-        meal_data = {}
-        
-        for date_str, categories in meals_by_date.items():
-            for category, logs in categories.items():
-                total_cals = sum(log.calories for log in logs)
-                foods_list = ", ".join([log.food_name for log in logs[:3]])  # Show first 3 foods
-                if len(logs) > 3:
-                    foods_list += f" (+{len(logs)-3} more)"
-                
-                option_label = f"{date_str} - {category} ({len(logs)} items, {int(total_cals)} cal) - {foods_list}"
-                meal_options.append(option_label)
-                meal_data[option_label] = {
-                    'date': date_str,
-                    'category': category,
-                    'logs': logs
-                }
-        
-        selected_past_meal = st.selectbox(
-            "Select a past meal to copy:",
-            options=["-- Select a past meal --"] + meal_options,
-            key="past_meal_selector"
-        )
-        
-        if selected_past_meal != "-- Select a past meal --":
-            meal_info = meal_data[selected_past_meal]
-            
-            # Show meal details
-            with st.expander("📖 View Meal Details", expanded=True):
-                st.write(f"**From:** {meal_info['date']} - {meal_info['category']}")
-                st.write(f"**Items in this meal:**")
-                
-                meal_details = []
-                for log in meal_info['logs']:
-                    meal_details.append({
-                        'Food': log.food_name,
-                        'Calories': int(log.calories),
-                        'Protein': f"{log.protein:.1f}g",
-                        'Fat': f"{log.fat:.1f}g",
-                        'Carbs': f"{log.carbs:.1f}g"
-                    })
-                
-                df = pd.DataFrame(meal_details)
-                st.dataframe(df, hide_index=True, use_container_width=True)
-                
-                # Totals
-                total_cals = sum(log.calories for log in meal_info['logs'])
-                total_prot = sum(log.protein for log in meal_info['logs'])
-                total_fat = sum(log.fat for log in meal_info['logs'])
-                total_carbs = sum(log.carbs for log in meal_info['logs'])
-                
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.metric("Total Calories", int(total_cals))
-                with col2:
-                    st.metric("Total Protein", f"{total_prot:.1f}g")
-                with col3:
-                    st.metric("Total Fat", f"{total_fat:.1f}g")
-                with col4:
-                    st.metric("Total Carbs", f"{total_carbs:.1f}g")
-            
-            # Option to copy to a different meal category
-            st.write("**Copy to:**")
-            target_category = st.radio(
-                "Select target meal category:",
-                meal_categories,
-                horizontal=True,
-                key="target_meal_category"
-            )
-            
-            col1, col2 = st.columns([1, 3])
-            with col1:
-                if st.button("📋 Copy This Meal", type="primary", use_container_width=True):
-                    # Copy all foods from this meal to current date
-                    for log in meal_info['logs']:
-                        new_log = FoodLog(
-                            username=st.session_state.logged_in_user,
-                            log_date=st.session_state.current_date,
-                            food_name=log.food_name,
-                            calories=log.calories,
-                            protein=log.protein,
-                            fat=log.fat,
-                            carbs=log.carbs,
-                            fiber=log.fiber,
-                            sodium=log.sodium,
-                            meal_category=target_category
-                        )
+                if add_button:
+                    new_log = FoodLog(
+                        username=st.session_state.logged_in_user,
+                        log_date=st.session_state.current_date,
+                        food_name=st.session_state.selected_food['description'],
+                        calories=macros_data['calories'] * multiplier,
+                        protein=macros_data['protein'] * multiplier,
+                        fat=macros_data['fat'] * multiplier,
+                        carbs=macros_data['carbs'] * multiplier,
+                        fiber=macros_data['fiber'] * multiplier,
+                        sodium=macros_data['sodium'] * multiplier,
+                        meal_category=st.session_state.selected_meal_category
+                    )
+                    with Session.begin() as session:
                         session.add(new_log)
-                    
-                    session.commit()
-                    st.success(f"✅ Copied {len(meal_info['logs'])} items to {target_category}!")
+                    st.success(f"Added {grams}g of {st.session_state.selected_food['description']} to {st.session_state.selected_meal_category}!")
+                    st.session_state.selected_food = None
+                    st.session_state.food_log_version += 1
+                    st.rerun()
+                
+                if cancel_button:
+                    st.session_state.selected_food = None
                     st.rerun()
-            
-            with col2:
-                st.info("💡 This will copy all foods from the selected meal to your current date.")
-    else:
-        st.info("No past meals found in the last 30 days. Start logging meals to use this feature!")
     
-    # Food database search section
+    # Manual entry section
     st.divider()
-    st.subheader("🔍 Add Food")
-    
-    # Meal category selector
-    selected_category = st.radio(
-        "Select meal:",
-        meal_categories,
-        horizontal=True,
-        key="meal_category_selector"
-    )
-    st.session_state.selected_meal_category = selected_category
-    
-    # Low fiber/sodium reference
-    with st.expander("📋 Quick Reference: Low Fiber & Low Sodium Foods"):
-        st.markdown("""
-        **Best options for cutting weight before weigh-in:**
-        
-        ### 🥩 Meats (0g fiber)
-        **Beef:**
-        - **Beef, round, eye of round** - 122 cal, 23.4g protein, 50mg sodium
-        - **Beef, porterhouse steak** - 145 cal, 22.7g protein, 43mg sodium
-        - **Beef, top loin steak** - 155 cal, 22.8g protein, 45mg sodium
-        - **Beef, tenderloin roast** - 176 cal, 27.7g protein, 54mg sodium
-        - **Beef, t-bone steak** - 219 cal, 27.3g protein, 67mg sodium
-        - **Beef, top round roast** - Available in database
-        - **Frankfurter, beef, unheated** - Available in database
-        
-        **Chicken:**
-        - **Chicken, breast** (skinless, boneless, cooked, braised)
-        - **Chicken, drumstick** (meat only, cooked, braised)
-        
-        **Pork:**
-        - **Pork, bacon** (cooked, restaurant)
-        - **Sausage, Italian, pork, mild** (cooked, pan-fried)
-        - **Sausage, pork, chorizo** (link or ground, cooked, pan-fried)
-        - **Restaurant, Chinese, sweet and sour pork**
-        - **Restaurant, Latino, tamale, pork**
-        
-        **Turkey:**
-        - **Turkey, ground** (93% lean, 7% fat, pan-broiled crumbles)
-        - **Sausage, turkey, breakfast links, mild, raw**
+    st.subheader("✏️ Manual Entry")
+    with st.form("add_food_form"):
+        col1, col2 = st.columns(2)
         
-        **Ham:**
-        - **Ham, sliced, pre-packaged** (deli meat, 96% fat free, water added)
+        with col1:
+            food_name = st.text_input("Food Name")
+            manual_calories = st.number_input("Calories (optional - leave 0 to auto-calculate)", min_value=0.0, step=1.0, key="manual_calories")
+            protein = st.number_input("Protein (g)", min_value=0.0, step=0.1, key="manual_protein")
+            fat = st.number_input("Fat (g)", min_value=0.0, step=0.1, key="manual_fat")
         
-        **Other Sausages:**
-        - **Sausage, breakfast sausage, beef** (pre-cooked, unprepared)
+        with col2:
+            carbs = st.number_input("Carbs (g)", min_value=0.0, step=0.1, key="manual_carbs")
+            fiber = st.number_input("Fiber (g)", min_value=0.0, step=0.1, key="manual_fiber")
+            sodium = st.number_input("Sodium (mg)", min_value=0.0, step=1.0, key="manual_sodium")
         
-        ### 🍞 Grains & Breads
-        **Breads:**
-        - **Bread, white, commercially prepared**
+        # Calculate calories from macros (Protein: 4 cal/g, Fat: 9 cal/g, Carbs: 4 cal/g)
+        calculated_calories = protein * _P + fat * _F + carbs * _C
         
-        **Flours:**
-        - **Rice flour, white** - 359 cal, 0.5g fiber, 5mg sodium
-        - **Flour, bread, white** (enriched, unbleached)
+        # Use manual calories if provided, otherwise use calculated
+        final_calories = manual_calories if manual_calories > 0 else calculated_calories
         
-        **Other Grains:**
-        - **Restaurant, Chinese, fried rice, without meat**
+        # Display calorie information
+        if manual_calories > 0:
+            st.info(f"**Using Manual Calories:** {manual_calories:.1f} kcal")
+        else:
+            st.info(f"**Auto-Calculated Calories:** {calculated_calories:.1f} kcal (P: {protein*_P:.0f} + F: {fat*_F:.0f} + C: {carbs*_C:.0f})")
         
-        ### 🍇 Fruits (Low fiber: 0.2-2g)
-        - **Grapefruit juice** - 37 cal, 0.2g fiber, 1mg sodium
-        - **Cantaloupe** - 34 cal, 0.8g fiber, 30mg sodium
-        - **Bananas** - 97 cal, 1.7g fiber, 0mg sodium
-        - **Apples (Honeycrisp)** - 60 cal, 1.7g fiber, 0mg sodium
-        - **Peaches** - 42 cal, 1.5g fiber, 13mg sodium
-        - **Nectarines** - 39 cal, 1.5g fiber, 13mg sodium
-        - **Strawberries** - 31 cal, 1.8g fiber, 10mg sodium
-        - **Oranges** - 47 cal, 2.0g fiber, 9mg sodium
+        # Create two columns for buttons
+        button_col1, button_col2 = st.columns(2)
         
-        ### 🥛 Dairy
-        - **Greek yogurt, strawberry, nonfat** - 83 cal, 8.1g protein, 0.6g fiber, 32mg sodium
+        with button_col1:
+            submit_button = st.form_submit_button("Add Manually", type="primary")
+        with button_col2:
+            clear_button = st.form_submit_button("Clear", type="secondary")
         
-        ### 🍚 Other
-        - **Onions, white** - 35 cal, 1.2g fiber, 2mg sodium
+        if clear_button:
+            st.rerun()
         
-        💡 *All nutrition values per 100g unless otherwise noted. All beef and meat options have 0g fiber!*
-        💡 *Search the database for any of these items to get complete nutritional information.*
-        """)
-    
-    st.write("")  # Add some spacing
-    
-    search_term = st.text_input("Search for a food:", placeholder="e.g., chicken, apple, rice")
-    
-    if search_term:
-        with st.spinner("Searching..."):
-            search_results = search_foods(search_term)
-            
-            if not search_results.empty:
-                st.write(f"Found {len(search_results)} results:")
-                
-                # Create a selectbox for food selection
-                food_options = {
-                    f"{row['description']} ({row['data_type']})": {
-                        'fdc_id': row['fdc_id'],
-                        'description': row['description']
-                    }
-                    for idx, row in search_results.iterrows()
-                }
-                
-                selected_food_key = st.selectbox(
-                    "Select a food:",
-                    options=["-- Select --"] + list(food_options.keys()),
-                    key="food_selector"
+        if submit_button:
+            if food_name:
+                new_log = FoodLog(
+                    username=st.session_state.logged_in_user,
+                    log_date=st.session_state.current_date,
+                    food_name=food_name,
+                    calories=final_calories,
+                    protein=protein,
+                    fat=fat,
+                    carbs=carbs,
+                    fiber=fiber,
+                    sodium=sodium,
+                    meal_category=st.session_state.selected_meal_category
                 )
-                
-                if selected_food_key != "-- Select --":
-                    if st.button("Add This Food", type="primary"):
-                        st.session_state.selected_food = food_options[selected_food_key]
-                        st.rerun()
+                with Session.begin() as session:
+                    session.add(new_log)
+                st.success(f"Added {food_name} to {st.session_state.selected_meal_category}!")
+                st.session_state.food_log_version += 1
+                st.rerun()
             else:
-                st.info("No foods found. Try a different search term.")
-    
-    # Display selected food details and add form
-    if st.session_state.selected_food:
+                st.error("Please enter a food name")
+
+@st.fragment
+def _edit_food_fragment(food_logs, logs_by_id):
+    """Edit-food form; fragment reruns keep widget changes local."""
+    # Edit food section
+    if food_logs:
         st.divider()
-        st.subheader(f"➕ Add: {st.session_state.selected_food['description']}")
-        
-        with st.spinner("Loading nutritional information..."):
-            macros_data = get_food_macros(st.session_state.selected_food['fdc_id'])
-            nutrients_data = get_food_nutrients(st.session_state.selected_food['fdc_id'])
-        
-        # Check if food has any nutritional data
-        has_data = macros_data['calories'] > 0 or macros_data['protein'] > 0 or macros_data['fat'] > 0 or macros_data['carbs'] > 0
+        st.subheader("✏️ Edit Food")
         
-        if not has_data:
-            st.warning("""
-                ⚠️ **No nutritional data available for this food.**
-                
-                This food item doesn't have nutrient information in the database. 
-                Try searching for a similar food or use manual entry below.
-                
-                💡 Tip: Foods marked as "foundation_food" usually have complete nutrition data.
-            """)
+        # Select food to edit
+        food_to_edit = st.selectbox(
+            "Select food to edit",
+            options=[log.id for log in food_logs],
+            format_func=lambda i: f"{logs_by_id[i].food_name} ({logs_by_id[i].meal_category}) - {logs_by_id[i].calories:.0f} cal",
+            key="edit_selectbox"
+        )
+
+        if food_to_edit:
+            edit_food_id = food_to_edit
+
+            # The selected log is already in memory
+            food_to_edit_obj = logs_by_id.get(edit_food_id)
             
-            if st.button("Clear Selection"):
-                st.session_state.selected_food = None
+            if food_to_edit_obj:
+                st.write(f"**Editing:** {food_to_edit_obj.food_name}")
+                
+                with st.form(f"edit_food_form_{edit_food_id}"):
+                    edit_col1, edit_col2 = st.columns(2)
+                    
+                    with edit_col1:
+                        edit_food_name = st.text_input("Food Name", value=food_to_edit_obj.food_name, key=f"edit_name_{edit_food_id}")
+                        edit_manual_calories = st.number_input("Calories (optional - leave 0 to auto-calculate)", min_value=0.0, step=1.0, value=food_to_edit_obj.calories, key=f"edit_cal_{edit_food_id}")
+                        edit_protein = st.number_input("Protein (g)", min_value=0.0, step=0.1, value=food_to_edit_obj.protein, key=f"edit_protein_{edit_food_id}")
+                        edit_fat = st.number_input("Fat (g)", min_value=0.0, step=0.1, value=food_to_edit_obj.fat, key=f"edit_fat_{edit_food_id}")
+                    
+                    with edit_col2:
+                        edit_carbs = st.number_input("Carbs (g)", min_value=0.0, step=0.1, value=food_to_edit_obj.carbs, key=f"edit_carbs_{edit_food_id}")
+                        edit_fiber = st.number_input("Fiber (g)", min_value=0.0, step=0.1, value=food_to_edit_obj.fiber, key=f"edit_fiber_{edit_food_id}")
+                        edit_sodium = st.number_input("Sodium (mg)", min_value=0.0, step=1.0, value=food_to_edit_obj.sodium, key=f"edit_sodium_{edit_food_id}")
+                        edit_meal_category = st.selectbox("Meal Category", options=['Breakfast', 'Lunch', 'Dinner', 'Snacks'], 
+                                                         index=['Breakfast', 'Lunch', 'Dinner', 'Snacks'].index(food_to_edit_obj.meal_category),
+                                                         key=f"edit_meal_{edit_food_id}")
+                    
+                    # Calculate calories from macros
+                    edit_calculated_calories = edit_protein * _P + edit_fat * _F + edit_carbs * _C
+                    
+                    # Use manual calories if provided, otherwise use calculated
+                    edit_final_calories = edit_manual_calories if edit_manual_calories > 0 else edit_calculated_calories
+                    
+                    # Display calorie information
+                    if edit_manual_calories > 0:
+                        st.info(f"**Using Manual Calories:** {edit_manual_calories:.1f} kcal")
+                    else:
+                        st.info(f"**Auto-Calculated Calories:** {edit_calculated_calories:.1f} kcal (P: {edit_protein*_P:.0f} + F: {edit_fat*_F:.0f} + C: {edit_carbs*_C:.0f})")
+                    
+                    # Create two columns for buttons
+                    edit_button_col1, edit_button_col2 = st.columns(2)
+                    
+                    with edit_button_col1:
+                        update_button = st.form_submit_button("Update Food", type="primary")
+                    with edit_button_col2:
+                        cancel_button = st.form_submit_button("Cancel", type="secondary")
+                    
+                    if cancel_button:
+                        st.rerun()
+                    
+                    if update_button:
+                        if edit_food_name:
+                            # Update the food log
+                            with Session.begin() as session:
+                                session.query(FoodLog).filter_by(id=edit_food_id).update({
+                                    'food_name': edit_food_name,
+                                    'calories': edit_final_calories,
+                                    'protein': edit_protein,
+                                    'fat': edit_fat,
+                                    'carbs': edit_carbs,
+                                    'fiber': edit_fiber,
+                                    'sodium': edit_sodium,
+                                    'meal_category': edit_meal_category
+                                })
+                            st.success(f"Updated {edit_food_name}!")
+                            st.session_state.food_log_version += 1
+                            st.rerun()
+                        else:
+                            st.error("Please enter a food name")
+
+@st.fragment
+def _delete_food_fragment(food_logs, logs_by_id):
+    """Delete-food selector; fragment reruns keep widget changes local."""
+    # Delete food section
+    if food_logs:
+        st.divider()
+        st.subheader("🗑️ Delete Food")
+        food_to_delete = st.selectbox(
+            "Select food to delete",
+            options=[log.id for log in food_logs],
+            format_func=lambda i: f"{logs_by_id[i].food_name} ({logs_by_id[i].meal_category})"
+        )
+
+        if st.button("Delete Selected Food"):
+            food_id = food_to_delete
+            with Session.begin() as session:
+                session.query(FoodLog).filter_by(id=food_id).delete()
+            st.success("Food deleted!")
+            st.session_state.food_log_version += 1
+            st.rerun()
+
+def food_log_page():
+    today = datetime.today().date()
+    st.title(f"🍽️ Food Log - {st.session_state.logged_in_user}")
+
+    # Navigation
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        if st.button("← Back to Profile"):
+            st.session_state.page = 'profile'
+            st.rerun()
+    with col2:
+        if st.button("📈 Progress"):
+            st.session_state.page = 'progress'
+            st.rerun()
+    with col3:
+        st.write(f"**Date:** {st.session_state.current_date}")
+    with col4:
+        if st.button("Logout"):
+            st.session_state.logged_in_user = None
+            st.session_state.page = 'login'
+            st.rerun()
+    
+    # Multi-day navigation for past days
+    st.divider()
+    st.subheader("📅 Date Navigation")
+    
+    col1, col2, col3, col4 = st.columns([1, 2, 2, 1])
+    
+    with col1:
+        # Previous day button
+        if st.button("◀ Previous", use_container_width=True):
+            st.session_state.current_date = st.session_state.current_date - timedelta(days=1)
+            st.session_state.show_weight_form = False
+            st.rerun()
+    
+    with col2:
+        # Date picker for past days only
+        max_date = today
+        selected_date = st.date_input(
+            "Select Date",
+            value=st.session_state.current_date,
+            max_value=max_date,
+            key="date_picker"
+        )
+        
+        # Update current_date if changed
+        if selected_date != st.session_state.current_date:
+            st.session_state.current_date = selected_date
+            st.session_state.show_weight_form = False
+            st.rerun()
+    
+    with col3:
+        # Show days from today
+        days_ago = (today - st.session_state.current_date).days
+        if days_ago == 0:
+            date_label = "📍 Today"
+        elif days_ago == 1:
+            date_label = "📅 Yesterday"
+        else:
+            date_label = f"📅 {days_ago} days ago"
+        
+        st.info(date_label)
+    
+    with col4:
+        # Next day button (only show if not viewing today)
+        if st.session_state.current_date < today:
+            if st.button("Next ▶", use_container_width=True):
+                st.session_state.current_date = st.session_state.current_date + timedelta(days=1)
+                st.session_state.show_weight_form = False
                 st.rerun()
         else:
-            # Display macro summary (per 100g)
-            st.info("📏 **Nutrition values shown per 100g**")
-            
-            col1, col2, col3, col4 = st.columns(4)
+            st.button("Today", disabled=True, use_container_width=True)
+    
+    st.divider()
+    
+    # Get user profile for targets, plus this date's weight log and the
+    # latest logged weight, in a single round-trip
+    profile = load_food_log_context(
+        st.session_state.logged_in_user, st.session_state.current_date
+    )
+
+    if not profile:
+        st.warning("Please complete your profile first!")
+        return
+    
+    # Weight tracking section - date aware title
+    if st.session_state.current_date == today:
+        st.subheader("⚖️ Today's Weight")
+    else:
+        days_ago = (today - st.session_state.current_date).days
+        if days_ago == 1:
+            st.subheader("⚖️ Yesterday's Weight")
+        else:
+            st.subheader(f"⚖️ Weight on {st.session_state.current_date.strftime('%B %d, %Y')}")
+    
+    # Check if weight already logged for this date (from the batched context)
+    weight_logged = profile.logged_weight is not None
+
+    # Show weight info and buttons when form is NOT showing
+    if weight_logged and not st.session_state.show_weight_form:
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            st.success(f"✅ Weight logged: **{profile.logged_weight} lbs**")
+            if profile.logged_notes:
+                st.info(f"Note: {profile.logged_notes}")
+        with col2:
+            if st.button("Update Weight"):
+                st.session_state.show_weight_form = True
+                st.rerun()
+    elif not weight_logged and not st.session_state.show_weight_form:
+        if st.session_state.current_date == today:
+            st.info("⚠️ No weight logged for today")
+            button_text = "Log Today's Weight"
+        else:
+            st.info(f"⚠️ No weight logged for {st.session_state.current_date.strftime('%B %d, %Y')}")
+            button_text = "Log Weight for This Day"
+        
+        if st.button(button_text):
+            st.session_state.show_weight_form = True
+            st.rerun()
+    
+    # Weight entry form - shows when flag is True
+    if st.session_state.show_weight_form:
+        with st.form("weight_log_form"):
+            st.write("### Log Your Weight")
+            col1, col2 = st.columns(2)
             with col1:
-                st.metric("Calories", f"{macros_data['calories']:.0f}")
+                current_weight = st.number_input(
+                    "Weight (lbs)", 
+                    min_value=0.0,
+                    value=profile.logged_weight if weight_logged else profile.weight,
+                    step=0.1
+                )
             with col2:
-                st.metric("Protein", f"{macros_data['protein']:.1f}g")
-            with col3:
-                st.metric("Fat", f"{macros_data['fat']:.1f}g")
-            with col4:
-                st.metric("Carbs", f"{macros_data['carbs']:.1f}g")
+                weight_notes = st.text_input(
+                    "Notes (optional)",
+                    value=profile.logged_notes if weight_logged else "",
+                    placeholder="e.g., morning, after workout"
+                )
             
             col1, col2 = st.columns(2)
             with col1:
-                st.metric("Fiber", f"{macros_data['fiber']:.1f}g")
+                save_weight = st.form_submit_button("Save Weight", type="primary")
             with col2:
-                st.metric("Sodium", f"{macros_data['sodium']:.0f}mg")
+                cancel_weight = st.form_submit_button("Cancel")
             
-            # Show expandable full nutrient details
-            with st.expander("📋 View All Nutrients"):
-                if not nutrients_data.empty:
-                    st.dataframe(nutrients_data, hide_index=True, use_container_width=True)
-                else:
-                    st.info("No detailed nutrient data available")
+            if save_weight:
+                params = {
+                    'username': st.session_state.logged_in_user,
+                    'log_date': st.session_state.current_date,
+                    'weight': current_weight,
+                    'notes': weight_notes
+                }
+                # Single UPSERT - no prior SELECT, no update-or-insert branch
+                with engine.begin() as conn:
+                    conn.execute(
+                        text("""
+                            INSERT INTO weight_logs (username, log_date, weight, notes)
+                            VALUES (:username, :log_date, :weight, :notes)
+                            ON CONFLICT (username, log_date)
+                            DO UPDATE SET weight = excluded.weight, notes = excluded.notes
+                        """),
+                        params
+                    )
+                load_food_log_context.clear()
+                _load_weight_logs.clear()
+                _weight_stats.clear()
+                _load_progress_context.clear()
+                st.session_state.show_weight_form = False
+                st.success(f"✅ Weight saved: {current_weight} lbs")
+                st.rerun()
             
-            # Add to log form
-            with st.form("add_from_database"):
-                st.write("**Enter amount in grams:**")
-                grams = st.number_input(
-                    "Grams", 
-                    min_value=1.0, 
-                    value=100.0, 
-                    step=10.0,
-                    help="All nutrition values are per 100g. Enter the amount you consumed."
-                )
-                
-                # Show calculated values for the specified grams
-                multiplier = grams / 100.0
-                st.write("**Calculated nutrition for your portion:**")
-                col1, col2, col3, col4 = st.columns(4)
+            if cancel_weight:
+                st.session_state.show_weight_form = False
+                st.rerun()
+    
+    st.divider()
+    
+    # Calculate lean body mass for protein
+    lean_body_mass = None
+    if profile.bodyfat_percentage and profile.bodyfat_percentage > 0:
+        lean_body_mass = profile.weight * (1 - profile.bodyfat_percentage / 100)
+
+    days_to_goal = (profile.target_date - st.session_state.current_date).days
+
+    # BMR plus activity-level calories and macro split for this day
+    bmr, base_calories, fat_pct = compute_targets(
+        profile.weight, profile.height, profile.bodyfat_percentage, days_to_goal
+    )
+
+    # Adjust calories based on actual progress (only when >3 days out)
+    target_calories, adjustment_info = adjust_calories_based_on_progress(
+        base_calories, profile.weight, profile.target_weight, days_to_goal,
+        profile.latest_weight
+    )
+    
+    # Calculate macros with adjusted calories
+    macros = calculate_macros(profile.weight, target_calories, fat_percentage=fat_pct, lean_body_mass=lean_body_mass)
+    
+    micros = calculate_micros(days_to_goal)
+    
+    # Load the day's data once; cached across pure widget reruns and
+    # invalidated by the food_log_version counter on any mutation
+    state = _load_day_state(
+        st.session_state.logged_in_user,
+        st.session_state.current_date,
+        st.session_state.food_log_version
+    )
+    food_logs = state.food_logs
+    logs_by_id = state.logs_by_id
+    meal_totals = state.meal_totals
+    frames_by_category = state.frames_by_category
+    meal_categories = MEAL_CATEGORIES
+
+    # Columns shown in the per-meal tables; meal_category stays behind
+    display_cols = ['Food', 'Calories', 'Protein', 'Fat', 'Carbs', 'Fiber', 'Sodium']
+
+    # Overall totals roll up from the four group rows
+    total_calories = sum(v['calories'] for v in meal_totals.values())
+    total_protein = sum(v['protein'] for v in meal_totals.values())
+    total_fat = sum(v['fat'] for v in meal_totals.values())
+    total_carbs = sum(v['carbs'] for v in meal_totals.values())
+    total_fiber = sum(v['fiber'] for v in meal_totals.values())
+    total_sodium = sum(v['sodium'] for v in meal_totals.values())
+    
+    # Display targets vs actual
+    if st.session_state.current_date == today:
+        st.subheader("📊 Today's Progress")
+    else:
+        st.subheader(f"📊 Progress for {st.session_state.current_date.strftime('%B %d, %Y')}")
+    
+    # Show calorie adjustment info if applicable
+    if adjustment_info.get('needs_weight_log'):
+        st.warning(f"⚠️ **Dynamic Adjustments Disabled:** {adjustment_info['reason']}\n\nLog your weight above to see automatic calorie adjustments!")
+    elif adjustment_info['adjusted']:
+        if adjustment_info['adjustment'] > 0:
+            st.success(f"📈 **Calorie Adjustment:** +{adjustment_info['adjustment']} cal/day - {adjustment_info['reason']}")
+        else:
+            st.warning(f"📉 **Calorie Adjustment:** {adjustment_info['adjustment']} cal/day - {adjustment_info['reason']}")
+    elif days_to_goal > 3:
+        st.info(f"✅ {adjustment_info['reason']}")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric(
+            "Calories",
+            f"{int(total_calories)}/{int(target_calories)}",
+            delta=f"{int(target_calories - total_calories)}"
+        )
+    with col2:
+        st.metric(
+            "Protein",
+            f"{int(total_protein)}/{int(macros['protein_grams'])}g",
+            delta=f"{int(macros['protein_grams'] - total_protein)}g"
+        )
+    with col3:
+        st.metric(
+            "Fat",
+            f"{int(total_fat)}/{int(macros['fat_grams'])}g",
+            delta=f"{int(macros['fat_grams'] - total_fat)}g"
+        )
+    with col4:
+        st.metric(
+            "Carbs",
+            f"{int(total_carbs)}/{int(macros['carb_grams'])}g",
+            delta=f"{int(macros['carb_grams'] - total_carbs)}g"
+        )
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric(
+            "Fiber",
+            f"{int(total_fiber)}/{micros['fiber_grams']}g",
+            delta=f"{int(micros['fiber_grams'] - total_fiber)}g"
+        )
+    with col2:
+        st.metric(
+            "Sodium",
+            f"{int(total_sodium)}/{micros['sodium_mg']}mg",
+            delta=f"{int(micros['sodium_mg'] - total_sodium)}mg"
+        )
+    
+    # Display meal breakdown
+    st.divider()
+    st.subheader("🍽️ Meal Breakdown")
+    
+    # Create tabs for each meal
+    tab1, tab2, tab3, tab4 = st.tabs(["🌅 Breakfast", "☀️ Lunch", "🌙 Dinner", "🍿 Snacks"])
+    
+    tabs = [tab1, tab2, tab3, tab4]
+    emojis = ['🌅', '☀️', '🌙', '🍿']
+
+    # Format the six per-meal metric strings in one pass up front
+    formatted_totals = {
+        category: (
+            f"{int(v['calories'])}", f"{int(v['protein'])}g",
+            f"{int(v['fat'])}g", f"{int(v['carbs'])}g",
+            f"{int(v['fiber'])}g", f"{int(v['sodium'])}mg"
+        )
+        for category, v in meal_totals.items()
+    }
+
+    for idx, (category, tab) in enumerate(zip(meal_categories, tabs)):
+        with tab:
+            totals = meal_totals[category]
+
+            if totals['count'] > 0:
+                cals_s, prot_s, fat_s, carbs_s, fiber_s, sodium_s = formatted_totals[category]
+                col1, col2, col3, col4, col5, col6 = st.columns(6)
                 with col1:
-                    st.write(f"Calories: {macros_data['calories'] * multiplier:.0f}")
+                    st.metric("Calories", cals_s)
                 with col2:
-                    st.write(f"Protein: {macros_data['protein'] * multiplier:.1f}g")
+                    st.metric("Protein", prot_s)
                 with col3:
-                    st.write(f"Fat: {macros_data['fat'] * multiplier:.1f}g")
+                    st.metric("Fat", fat_s)
                 with col4:
-                    st.write(f"Carbs: {macros_data['carbs'] * multiplier:.1f}g")
+                    st.metric("Carbs", carbs_s)
+                with col5:
+                    st.metric("Fiber", fiber_s)
+                with col6:
+                    st.metric("Sodium", sodium_s)
                 
-                col1, col2 = st.columns(2)
-                with col1:
-                    add_button = st.form_submit_button("Add to Log", type="primary")
-                with col2:
-                    cancel_button = st.form_submit_button("Cancel")
+                st.write("---")
                 
-                if add_button:
-                    new_log = FoodLog(
-                        username=st.session_state.logged_in_user,
-                        log_date=st.session_state.current_date,
-                        food_name=st.session_state.selected_food['description'],
-                        calories=macros_data['calories'] * multiplier,
-                        protein=macros_data['protein'] * multiplier,
-                        fat=macros_data['fat'] * multiplier,
-                        carbs=macros_data['carbs'] * multiplier,
-                        fiber=macros_data['fiber'] * multiplier,
-                        sodium=macros_data['sodium'] * multiplier,
-                        meal_category=st.session_state.selected_meal_category
+                # Show foods for this meal - grab the pre-split view
+                df = frames_by_category.get(category)
+
+                if df is not None:
+                    st.dataframe(
+                        df[display_cols],
+                        hide_index=True, use_container_width=True
                     )
-                    session.add(new_log)
-                    session.commit()
-                    st.success(f"Added {grams}g of {st.session_state.selected_food['description']} to {st.session_state.selected_meal_category}!")
-                    st.session_state.selected_food = None
-                    st.rerun()
-                
-                if cancel_button:
-                    st.session_state.selected_food = None
-                    st.rerun()
-    
-    # Manual entry section
-    st.divider()
-    st.subheader("✏️ Manual Entry")
-    with st.form("add_food_form"):
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            food_name = st.text_input("Food Name")
-            manual_calories = st.number_input("Calories (optional - leave 0 to auto-calculate)", min_value=0.0, step=1.0, key="manual_calories")
-            protein = st.number_input("Protein (g)", min_value=0.0, step=0.1, key="manual_protein")
-            fat = st.number_input("Fat (g)", min_value=0.0, step=0.1, key="manual_fat")
-        
-        with col2:
-            carbs = st.number_input("Carbs (g)", min_value=0.0, step=0.1, key="manual_carbs")
-            fiber = st.number_input("Fiber (g)", min_value=0.0, step=0.1, key="manual_fiber")
-            sodium = st.number_input("Sodium (mg)", min_value=0.0, step=1.0, key="manual_sodium")
-        
-        # Calculate calories from macros (Protein: 4 cal/g, Fat: 9 cal/g, Carbs: 4 cal/g)
-        calculated_calories = (protein * 4) + (fat * 9) + (carbs * 4)
-        
-        # Use manual calories if provided, otherwise use calculated
-        final_calories = manual_calories if manual_calories > 0 else calculated_calories
-        
-        # Display calorie information
-        if manual_calories > 0:
-            st.info(f"**Using Manual Calories:** {manual_calories:.1f} kcal")
-        else:
-            st.info(f"**Auto-Calculated Calories:** {calculated_calories:.1f} kcal (P: {protein*4:.0f} + F: {fat*9:.0f} + C: {carbs*4:.0f})")
-        
-        # Create two columns for buttons
-        button_col1, button_col2 = st.columns(2)
-        
-        with button_col1:
-            submit_button = st.form_submit_button("Add Manually", type="primary")
-        with button_col2:
-            clear_button = st.form_submit_button("Clear", type="secondary")
-        
-        if clear_button:
-            st.rerun()
-        
-        if submit_button:
-            if food_name:
-                new_log = FoodLog(
-                    username=st.session_state.logged_in_user,
-                    log_date=st.session_state.current_date,
-                    food_name=food_name,
-                    calories=final_calories,
-                    protein=protein,
-                    fat=fat,
-                    carbs=carbs,
-                    fiber=fiber,
-                    sodium=sodium,
-                    meal_category=st.session_state.selected_meal_category
-                )
-                session.add(new_log)
-                session.commit()
-                st.success(f"Added {food_name} to {st.session_state.selected_meal_category}!")
-                st.rerun()
             else:
-                st.error("Please enter a food name")
+                st.info(f"No foods logged for {category.lower()} yet.")
     
-    # Edit food section
-    if food_logs:
-        st.divider()
-        st.subheader("✏️ Edit Food")
-        
-        # Select food to edit
-        food_to_edit = st.selectbox(
-            "Select food to edit",
-            options=[f"{log.food_name} ({getattr(log, 'meal_category', 'Snacks')}) - {log.calories:.0f} cal - ID: {log.id}" for log in food_logs],
-            key="edit_selectbox"
+    # Copy Past Meals section
+    st.divider()
+    st.subheader("📋 Copy Past Meals")
+    
+    past_meal_groups = state.past_meal_groups
+
+    if past_meal_groups:
+        # Create options for selectbox
+        meal_labels = []
+        meal_data = []
+
+        for log_date, category, item_count, total_cals in past_meal_groups:
+            date_str = log_date.strftime('%Y-%m-%d')
+            category = category or 'Snacks'
+            meal_labels.append(f"{date_str} - {category} ({item_count} items, {int(total_cals)} cal)")
+            meal_data.append({
+                'date': date_str,
+                'log_date': log_date,
+                'category': category
+            })
+
+        # Options are indices; format_func renders the labels, so nothing
+        # has to be parsed back out of the selected string
+        selected_past_meal = st.selectbox(
+            "Select a past meal to copy:",
+            options=list(range(-1, len(meal_labels))),
+            format_func=lambda i: "-- Select a past meal --" if i < 0 else meal_labels[i],
+            key="past_meal_selector"
         )
-        
-        if food_to_edit:
-            edit_food_id = int(food_to_edit.split("ID: ")[1])
+
+        if selected_past_meal >= 0:
+            meal_info = meal_data[selected_past_meal]
+
+            # Fetch the individual logs only for the selected meal
+            meal_info['logs'] = _past_meal_logs(
+                st.session_state.logged_in_user,
+                meal_info['log_date'],
+                meal_info['category']
+            )
+
+            # Show meal details
+            with st.expander("📖 View Meal Details", expanded=True):
+                st.write(f"**From:** {meal_info['date']} - {meal_info['category']}")
+                st.write(f"**Items in this meal:**")
+
+                meal_details = []
+                for log in meal_info['logs']:
+                    meal_details.append({
+                        'Food': log['food_name'],
+                        'Calories': int(log['calories']),
+                        'Protein': f"{log['protein']:.1f}g",
+                        'Fat': f"{log['fat']:.1f}g",
+                        'Carbs': f"{log['carbs']:.1f}g"
+                    })
+
+                df = pd.DataFrame(meal_details)
+                st.dataframe(df, hide_index=True, use_container_width=True)
+
+                # Totals
+                total_cals = sum(log['calories'] for log in meal_info['logs'])
+                total_prot = sum(log['protein'] for log in meal_info['logs'])
+                total_fat = sum(log['fat'] for log in meal_info['logs'])
+                total_carbs = sum(log['carbs'] for log in meal_info['logs'])
+                
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("Total Calories", int(total_cals))
+                with col2:
+                    st.metric("Total Protein", f"{total_prot:.1f}g")
+                with col3:
+                    st.metric("Total Fat", f"{total_fat:.1f}g")
+                with col4:
+                    st.metric("Total Carbs", f"{total_carbs:.1f}g")
             
-            # Get the selected food log
-            food_to_edit_obj = session.query(FoodLog).filter_by(id=edit_food_id).first()
+            # Option to copy to a different meal category
+            st.write("**Copy to:**")
+            target_category = st.radio(
+                "Select target meal category:",
+                meal_categories,
+                horizontal=True,
+                key="target_meal_category"
+            )
             
-            if food_to_edit_obj:
-                st.write(f"**Editing:** {food_to_edit_obj.food_name}")
-                
-                with st.form(f"edit_food_form_{edit_food_id}"):
-                    edit_col1, edit_col2 = st.columns(2)
-                    
-                    with edit_col1:
-                        edit_food_name = st.text_input("Food Name", value=food_to_edit_obj.food_name, key=f"edit_name_{edit_food_id}")
-                        edit_manual_calories = st.number_input("Calories (optional - leave 0 to auto-calculate)", min_value=0.0, step=1.0, value=food_to_edit_obj.calories, key=f"edit_cal_{edit_food_id}")
-                        edit_protein = st.number_input("Protein (g)", min_value=0.0, step=0.1, value=food_to_edit_obj.protein, key=f"edit_protein_{edit_food_id}")
-                        edit_fat = st.number_input("Fat (g)", min_value=0.0, step=0.1, value=food_to_edit_obj.fat, key=f"edit_fat_{edit_food_id}")
-                    
-                    with edit_col2:
-                        edit_carbs = st.number_input("Carbs (g)", min_value=0.0, step=0.1, value=food_to_edit_obj.carbs, key=f"edit_carbs_{edit_food_id}")
-                        edit_fiber = st.number_input("Fiber (g)", min_value=0.0, step=0.1, value=food_to_edit_obj.fiber, key=f"edit_fiber_{edit_food_id}")
-                        edit_sodium = st.number_input("Sodium (mg)", min_value=0.0, step=1.0, value=food_to_edit_obj.sodium, key=f"edit_sodium_{edit_food_id}")
-                        edit_meal_category = st.selectbox("Meal Category", options=['Breakfast', 'Lunch', 'Dinner', 'Snacks'], 
-                                                         index=['Breakfast', 'Lunch', 'Dinner', 'Snacks'].index(getattr(food_to_edit_obj, 'meal_category', 'Snacks')),
-                                                         key=f"edit_meal_{edit_food_id}")
-                    
-                    # Calculate calories from macros
-                    edit_calculated_calories = (edit_protein * 4) + (edit_fat * 9) + (edit_carbs * 4)
-                    
-                    # Use manual calories if provided, otherwise use calculated
-                    edit_final_calories = edit_manual_calories if edit_manual_calories > 0 else edit_calculated_calories
-                    
-                    # Display calorie information
-                    if edit_manual_calories > 0:
-                        st.info(f"**Using Manual Calories:** {edit_manual_calories:.1f} kcal")
-                    else:
-                        st.info(f"**Auto-Calculated Calories:** {edit_calculated_calories:.1f} kcal (P: {edit_protein*4:.0f} + F: {edit_fat*9:.0f} + C: {edit_carbs*4:.0f})")
-                    
-                    # Create two columns for buttons
-                    edit_button_col1, edit_button_col2 = st.columns(2)
-                    
-                    with edit_button_col1:
-                        update_button = st.form_submit_button("Update Food", type="primary")
-                    with edit_button_col2:
-                        cancel_button = st.form_submit_button("Cancel", type="secondary")
-                    
-                    if cancel_button:
-                        st.rerun()
-                    
-                    if update_button:
-                        if edit_food_name:
-                            # Update the food log
-                            food_to_edit_obj.food_name = edit_food_name
-                            food_to_edit_obj.calories = edit_final_calories
-                            food_to_edit_obj.protein = edit_protein
-                            food_to_edit_obj.fat = edit_fat
-                            food_to_edit_obj.carbs = edit_carbs
-                            food_to_edit_obj.fiber = edit_fiber
-                            food_to_edit_obj.sodium = edit_sodium
-                            food_to_edit_obj.meal_category = edit_meal_category
-                            
-                            session.commit()
-                            st.success(f"Updated {edit_food_name}!")
-                            st.rerun()
-                        else:
-                            st.error("Please enter a food name")
+            col1, col2 = st.columns([1, 3])
+            with col1:
+                if st.button("📋 Copy This Meal", type="primary", use_container_width=True):
+                    # Copy all foods from this meal to current date as one
+                    # Core executemany - one statement, one commit/fsync
+                    with Session.begin() as session:
+                        session.execute(insert(FoodLog), [
+                            dict(
+                                username=st.session_state.logged_in_user,
+                                log_date=st.session_state.current_date,
+                                meal_category=target_category,
+                                **log
+                            )
+                            for log in meal_info['logs']
+                        ])
+                    st.success(f"✅ Copied {len(meal_info['logs'])} items to {target_category}!")
+                    st.session_state.food_log_version += 1
+                    st.rerun()
+            
+            with col2:
+                st.info("💡 This will copy all foods from the selected meal to your current date.")
+    else:
+        st.info("No past meals found in the last 30 days. Start logging meals to use this feature!")
     
-    # Delete food section
-    if food_logs:
-        st.divider()
-        st.subheader("🗑️ Delete Food")
-        food_to_delete = st.selectbox(
-            "Select food to delete",
-            options=[f"{log.food_name} ({getattr(log, 'meal_category', 'Snacks')}) - ID: {log.id}" for log in food_logs]
+    # Add / edit / delete run as fragments: widget churn inside them no
+    # longer re-executes the day's queries and aggregation above
+    _add_food_fragment(meal_categories)
+    _edit_food_fragment(food_logs, logs_by_id)
+    _delete_food_fragment(food_logs, logs_by_id)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _load_progress_context(username):
+    """Profile columns plus weight-log count and date range in one query.
+
+    Returns None when the user has no profile; log_count is 0 when no
+    weights are logged yet. One round trip replaces the separate profile
+    and summary queries.
+    """
+    profiles = UserProfile.__table__
+    w = WeightLog.__table__
+    return get_read_conn().execute(
+        select(
+            profiles,
+            func.count(w.c.id).label('log_count'),
+            func.min(w.c.log_date).label('first_log_date'),
+            func.max(w.c.log_date).label('last_log_date')
         )
-        
-        if st.button("Delete Selected Food"):
-            food_id = int(food_to_delete.split("ID: ")[1])
-            session.query(FoodLog).filter_by(id=food_id).delete()
-            session.commit()
-            st.success("Food deleted!")
-            st.rerun()
-    
-    session.close()
+        .select_from(profiles.outerjoin(w, w.c.username == profiles.c.username))
+        .where(profiles.c.username == username)
+        .group_by(profiles.c.id)
+    ).first()
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _load_weight_logs(username):
+    """All of a user's weight logs ordered by date, as plain rows.
+
+    Cleared on weight saves and deletes; the ttl bounds staleness from
+    writes made in other sessions.
+    """
+    return get_read_conn().execute(
+        select(WeightLog.__table__)
+        .where(WeightLog.username == username)
+        .order_by(WeightLog.log_date)
+    ).all()
+
+def _lttb_downsample(x, y, n_out=2000):
+    """Largest-Triangle-Three-Buckets downsampling for long plot traces.
+
+    Keeps the ~n_out visually dominant points (endpoints always survive)
+    so the chart payload stays bounded regardless of history length.
+    """
+    n = len(y)
+    if n <= n_out:
+        return x, y
+
+    xf = x.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    yf = np.asarray(y, dtype=np.float64)
+
+    # Interior points split into n_out - 2 even buckets; one point per
+    # bucket, chosen to maximize the triangle area against the previously
+    # selected point and the next bucket's average
+    bounds = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    out_idx = np.empty(n_out, dtype=np.int64)
+    out_idx[0] = 0
+    out_idx[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = bounds[i], bounds[i + 1]
+        nhi = bounds[i + 2] if i + 2 <= n_out - 2 else n
+        avg_x = xf[hi:nhi].mean()
+        avg_y = yf[hi:nhi].mean()
+        area = np.abs(
+            (xf[a] - avg_x) * (yf[lo:hi] - yf[a])
+            - (xf[a] - xf[lo:hi]) * (avg_y - yf[a])
+        )
+        a = lo + int(area.argmax())
+        out_idx[i + 1] = a
+
+    return x[out_idx], y[out_idx]
+
+@st.cache_data(ttl=300, show_spinner=False)
+def build_weight_fig(dates, weights, target_weight, target_date):
+    """Assemble the weight-trend figure, memoized on the series itself.
+
+    dates and weights arrive as plain tuples so st.cache_data can hash
+    them; unchanged history returns the cached figure without touching
+    Plotly at all.
+    """
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+
+    # Add weight line, downsampled for very long histories so the chart
+    # payload shipped to the browser stays bounded
+    weight_dates = pd.to_datetime(dates)
+    plot_x = weight_dates.to_numpy()
+    plot_y = np.asarray(weights, dtype=np.float32)
+    if len(plot_y) > 2000:
+        plot_x, plot_y = _lttb_downsample(plot_x, plot_y)
+
+    fig.add_trace(go.Scattergl(
+        x=plot_x,
+        y=plot_y,
+        mode='lines+markers',
+        name='Actual Weight',
+        line=dict(color='#1f77b4', width=3),
+        marker=dict(size=8)
+    ))
+
+    # Calculate target weight for each day based on days to target date,
+    # vectorized over the whole date range in one C-level broadcast
+    target_ts = pd.Timestamp(target_date)
+    # dates arrive ORDER BY log_date, so the endpoints are O(1) lookups
+    # rather than full-column reductions
+    start_date = weight_dates[0]
+    end_date = max(weight_dates[-1], target_ts)
+
+    target_dates = pd.date_range(start_date, end_date, freq='D')
+    days_until_target = (target_ts - target_dates).days.to_numpy()
+    # 3+ days out: +5%, 2 days: +3.9%, 1 day: +2.1%, day 0 on: target
+    multiplier = np.select(
+        [days_until_target >= 3, days_until_target == 2, days_until_target == 1],
+        [1.05, 1.039, 1.021],
+        default=1.0
+    )
+    target_weights_list = target_weight * multiplier
+
+    # Add target progression line
+    fig.add_trace(go.Scattergl(
+        x=target_dates,
+        y=target_weights_list,
+        mode='lines+markers',
+        name='Target Progression',
+        line=dict(color='#2ca02c', width=2, dash='dash'),
+        marker=dict(size=6)
+    ))
+
+    # Update layout
+    fig.update_layout(
+        title='Weight Over Time vs Target Progression',
+        xaxis_title='Date',
+        yaxis_title='Weight (lbs)',
+        hovermode='x unified',
+        height=500,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+
+    return fig
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _weight_stats(username):
+    """History endpoints for the stats block in one aggregate round trip.
+
+    The date range comes from min/max aggregates and the starting/current
+    weights from two LIMIT 1 scalar subqueries, all in a single statement
+    with zero ORM hydration.
+    """
+    starting_sq = (
+        select(WeightLog.weight)
+        .where(WeightLog.username == username)
+        .order_by(WeightLog.log_date)
+        .limit(1)
+        .scalar_subquery()
+    )
+    current_sq = (
+        select(WeightLog.weight)
+        .where(WeightLog.username == username)
+        .order_by(WeightLog.log_date.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    return get_read_conn().execute(
+        select(
+            func.min(WeightLog.log_date).label('first_date'),
+            func.max(WeightLog.log_date).label('last_date'),
+            starting_sq.label('starting_weight'),
+            current_sq.label('current_weight'),
+            func.count(WeightLog.id).label('log_count')
+        ).where(WeightLog.username == username)
+    ).first()
 
 def progress_page():
     st.title(f"📈 Progress Tracking - {st.session_state.logged_in_user}")
@@ -1470,40 +1986,33 @@ def progress_page():
             st.session_state.page = 'login'
             st.rerun()
     
-    # Get user data
-    session = Session()
-    profile = session.query(UserProfile).filter_by(
-        username=st.session_state.logged_in_user
-    ).first()
-    
+    # Profile plus weight-log summary from one cached round trip
+    profile = _load_progress_context(st.session_state.logged_in_user)
+
     if not profile:
         st.warning("Please complete your profile first!")
-        session.close()
         return
-    
-    # Get all weight logs for this user
-    weight_logs = session.query(WeightLog).filter_by(
-        username=st.session_state.logged_in_user
-    ).order_by(WeightLog.log_date).all()
-    
-    if not weight_logs:
+
+    if not profile.log_count:
         st.info("📊 No weight data logged yet. Start logging your weight on the Food Log page!")
-        session.close()
         return
-    
-    # Create dataframe for plotting
-    weight_data = pd.DataFrame([
-        {
-            'Date': log.log_date,
-            'Weight': log.weight,
-            'Notes': log.notes
-        }
-        for log in weight_logs
-    ])
-    
-    # Calculate statistics
-    current_weight = weight_logs[-1].weight
-    starting_weight = weight_logs[0].weight
+
+    # Get all weight logs for this user (chart, table, delete selector)
+    weight_logs = _load_weight_logs(st.session_state.logged_in_user)
+    
+    # Create dataframe for plotting - build the three columns in one pass
+    # instead of a dict per row, so pandas skips the row->column transpose
+    dates, weights, notes = zip(*((log.log_date, log.weight, log.notes) for log in weight_logs))
+    weight_data = pd.DataFrame({
+        'Date': pd.to_datetime(dates),
+        'Weight': np.asarray(weights, dtype=np.float32),
+        'Notes': pd.Categorical(notes)
+    })
+    
+    # Calculate statistics from the single aggregate row
+    stats = _weight_stats(st.session_state.logged_in_user)
+    current_weight = stats.current_weight
+    starting_weight = stats.starting_weight
     weight_change = current_weight - starting_weight
     target_weight = profile.target_weight
     remaining_to_goal = target_weight - current_weight
@@ -1543,79 +2052,15 @@ def progress_page():
         st.progress(progress_percentage / 100)
         st.write(f"**Progress: {progress_percentage:.1f}%** of goal reached")
     
-    # Weight chart
+    # Weight chart - built inside a cached helper so no-op reruns skip
+    # trace construction and the target-line math entirely
     st.subheader("📉 Weight Trend")
-    
-    # Create line chart
-    import plotly.graph_objects as go
-    
-    fig = go.Figure()
-    
-    # Add weight line
-    fig.add_trace(go.Scatter(
-        x=weight_data['Date'],
-        y=weight_data['Weight'],
-        mode='lines+markers',
-        name='Actual Weight',
-        line=dict(color='#1f77b4', width=3),
-        marker=dict(size=8)
-    ))
-    
-    # Calculate target weight for each day based on days to target date
-    # Create target line data points
-    target_dates = []
-    target_weights_list = []
-    
-    # Get the date range
-    start_date = weight_data['Date'].min()
-    end_date = max(weight_data['Date'].max(), profile.target_date)
-    
-    # Create daily target weights
-    current_date = start_date
-    while current_date <= end_date:
-        days_until_target = (profile.target_date - current_date).days
-        
-        # Calculate target weight based on days remaining
-        if days_until_target >= 3:
-            daily_target = target_weight * 1.05  # 3+ days: +5%
-        elif days_until_target == 2:
-            daily_target = target_weight * 1.039  # 2 days: +3.9%
-        elif days_until_target == 1:
-            daily_target = target_weight * 1.021  # 1 day: +2.1%
-        else:
-            daily_target = target_weight  # Day 0: target weight
-        
-        target_dates.append(current_date)
-        target_weights_list.append(daily_target)
-        current_date += pd.Timedelta(days=1)
-    
-    # Add target progression line
-    fig.add_trace(go.Scatter(
-        x=target_dates,
-        y=target_weights_list,
-        mode='lines+markers',
-        name='Target Progression',
-        line=dict(color='#2ca02c', width=2, dash='dash'),
-        marker=dict(size=6)
-    ))
-    
-    # Update layout
-    fig.update_layout(
-        title='Weight Over Time vs Target Progression',
-        xaxis_title='Date',
-        yaxis_title='Weight (lbs)',
-        hovermode='x unified',
-        height=500,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
-        )
-    )
-    
-    st.plotly_chart(fig, use_container_width=True)
+
+    fig = build_weight_fig(dates, weights, target_weight, profile.target_date)
+
+    # Stable key lets the frontend diff the chart in place instead of
+    # tearing the plot down and rebuilding it on every rerun
+    st.plotly_chart(fig, use_container_width=True, key="weight_trend")
     
     # Explanation of target line
     st.info("""
@@ -1637,7 +2082,7 @@ def progress_page():
     
     if len(weight_logs) > 1:
         # Calculate rate of change
-        days_tracked = (weight_logs[-1].log_date - weight_logs[0].log_date).days
+        days_tracked = (stats.last_date - stats.first_date).days
         if days_tracked > 0:
             avg_change_per_day = weight_change / days_tracked
             
@@ -1657,45 +2102,49 @@ def progress_page():
     # Weight log table
     st.subheader("📝 Weight History")
     
-    # Reverse the dataframe to show most recent first
-    display_data = weight_data.sort_values('Date', ascending=False).copy()
+    # Most recent first: the rows arrive ORDER BY log_date from SQL, so a
+    # reverse view is equivalent to the descending sort at O(1) cost
+    display_data = weight_data.iloc[::-1]
     
-    # Convert Date to datetime if it's not already, then format as string
-    if not pd.api.types.is_datetime64_any_dtype(display_data['Date']):
-        display_data['Date'] = pd.to_datetime(display_data['Date'])
+    # Date is always datetime64 here; strftime is already vectorized
     display_data['Date'] = display_data['Date'].dt.strftime('%Y-%m-%d')
-    
-    display_data['Weight'] = display_data['Weight'].apply(lambda x: f"{x:.1f} lbs")
-    
-    st.dataframe(display_data, hide_index=True, use_container_width=True)
+
+    # Format weights in one C-level pass instead of a Python call per row
+    w = display_data['Weight'].to_numpy(dtype=np.float32)
+    display_data['Weight'] = np.char.add(np.round(w, 1).astype('U8'), ' lbs')
+
+    # Ship only the recent page to the frontend; the full table renders
+    # lazily inside the expander for users who want to scroll back
+    st.dataframe(display_data.head(50), hide_index=True, use_container_width=True, height=400)
+    if len(display_data) > 50:
+        with st.expander("Show full history"):
+            st.dataframe(display_data, hide_index=True, use_container_width=True)
     
     # Delete weight entry
     if weight_logs:
         st.subheader("🗑️ Delete Weight Entry")
-        dates_to_delete = [f"{log.log_date} - {log.weight} lbs" for log in weight_logs]
-        date_to_delete = st.selectbox("Select date to delete", dates_to_delete)
-        
+        dates_to_delete = [(log.id, log.log_date, log.weight) for log in weight_logs]
+        entry_to_delete = st.selectbox(
+            "Select date to delete", dates_to_delete,
+            format_func=lambda e: f"{e[1]} - {e[2]} lbs"
+        )
+
         if st.button("Delete Selected Entry", type="secondary"):
-            # Extract date from selection
-            delete_date_str = date_to_delete.split(" - ")[0]
-            delete_date = datetime.strptime(delete_date_str, '%Y-%m-%d').date()
-            
-            session.query(WeightLog).filter_by(
-                username=st.session_state.logged_in_user,
-                log_date=delete_date
-            ).delete()
-            session.commit()
+            # Delete straight by primary key - no date parsing round trip
+            with Session.begin() as session:
+                session.execute(delete(WeightLog).where(WeightLog.id == entry_to_delete[0]))
+            _load_weight_logs.clear()
+            _weight_stats.clear()
+            _load_progress_context.clear()
+            load_food_log_context.clear()
             st.success("Weight entry deleted!")
             st.rerun()
-    
-    session.close()
 
 # Main app logic
-if st.session_state.page == 'login':
-    login_page()
-elif st.session_state.page == 'profile':
-    profile_page()
-elif st.session_state.page == 'food_log':
-    food_log_page()
-elif st.session_state.page == 'progress':
-    progress_page()
+PAGES = {
+    'login': login_page,
+    'profile': profile_page,
+    'food_log': food_log_page,
+    'progress': progress_page,
+}
+PAGES[st.session_state.page]()